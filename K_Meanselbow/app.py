@@ -1,8 +1,47 @@
 import streamlit as st
 import numpy as np
-import joblib
-import matplotlib.pyplot as plt
 import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from common import metrics
+from common.batching import get_batcher
+from common.startup import FAST_START, prewarm
+
+# Set KMEANS_LOOKUP_GRID=1 to assign through the precomputed lookup grid
+# (and draw the cluster regions) instead of calling the scaler + model
+USE_LOOKUP_GRID = os.environ.get("KMEANS_LOOKUP_GRID", "0") == "1"
+
+
+def load_model():
+    """``(kmeans, scaler, grid)`` from the shared registry; grid is None when disabled."""
+    from common.bundle import bundle_path, has_bundle, load_bundle
+    from common.registry import load_artifact
+    from lookup_grid import get_grid
+
+    if has_bundle(bundle_path(BASE_DIR)):
+        bundle = load_bundle(bundle_path(BASE_DIR))
+        kmeans, scaler = bundle["kmeans"], bundle["scaler"]
+    else:
+        kmeans = load_artifact(os.path.join(BASE_DIR, "cluster_model.pkl"))
+        scaler = load_artifact(os.path.join(BASE_DIR, "scalar.pkl"))
+    return kmeans, scaler, get_grid(kmeans, scaler) if USE_LOOKUP_GRID else None
+
+
+def warm_up(loaded):
+    """One prediction and the plotting import, so the first click is fast too."""
+    kmeans, scaler, grid = loaded
+    X = np.array([[50.0, 50.0]])
+    if grid is not None:
+        grid.predict(X)
+        import matplotlib.pyplot  # noqa: F401
+    else:
+        kmeans.predict(scaler.transform(X))
+
 
 # ---------------- PAGE CONFIG ----------------
 st.set_page_config(
@@ -12,9 +51,11 @@ st.set_page_config(
 )
 
 # ---------------- LOAD MODEL & SCALER ----------------
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-kmeans = joblib.load(os.path.join(BASE_DIR, "cluster_model.pkl"))
-scaler = joblib.load(os.path.join(BASE_DIR, "scalar.pkl"))
+if FAST_START:
+    # Loaded and warmed up in the background while the page renders
+    prewarm("kmeans", load_model, warm_up)
+else:
+    load_model()
 
 # ---------------- ADVANCED UI CSS ----------------
 st.markdown("""
@@ -100,8 +141,18 @@ spending_score = st.number_input(
 # ---------------- PREDICTION ----------------
 if st.button("🔮 Predict Cluster"):
     input_data = np.array([[annual_income, spending_score]])
-    scaled_data = scaler.transform(input_data)
-    cluster = kmeans.predict(scaled_data)[0]
+    # Cached by the registry; waits for the prewarm thread if it is still loading
+    kmeans, scaler, grid = load_model()
+    with metrics.profile("kmeans"):
+        if grid is not None:
+            # O(1) grid lookup; exact model fallback near cluster boundaries
+            with metrics.stage("kmeans", "predict"):
+                cluster = grid.predict(input_data)[0]
+        else:
+            with metrics.stage("kmeans", "scale"):
+                scaled_data = scaler.transform(input_data)
+            with metrics.stage("kmeans", "predict"):
+                cluster = get_batcher("kmeans.predict", kmeans.predict).predict(scaled_data)[0]
 
     st.success(f"✅ Customer belongs to **Cluster {cluster}**")
 
@@ -115,6 +166,20 @@ if st.button("🔮 Predict Cluster"):
 
     st.info(cluster_info.get(cluster, "Cluster description not available"))
 
+    # ---------------- DECISION REGIONS ----------------
+    if grid is not None:
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots(figsize=(7, 4.5))
+        ax.imshow(grid.region_image().T, origin="lower", extent=grid.extent,
+                  aspect="auto", cmap="tab10", vmin=0, vmax=9, alpha=0.55)
+        ax.scatter([annual_income], [spending_score], c="black", marker="*", s=250)
+        ax.set_xlabel("Annual Income (k$)")
+        ax.set_ylabel("Spending Score (1-100)")
+        ax.set_title("Cluster regions")
+        st.pyplot(fig)
+        plt.close(fig)
+
     ''''''
 # ---------------- FOOTER ----------------
 st.markdown("---")
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Parallel elbow sweep for K-Means model selection.
+
+Fits one model per k on a process pool, finds the knee of the WCSS curve
+automatically and hands back the fitted model for that k, so nothing has to
+be refit afterwards.
+
+The scaled matrix is copied once into shared memory and every worker maps
+it as a read-only NumPy view, so large customer files are not pickled to
+each process.  ``method="minibatch"`` switches to ``MiniBatchKMeans``.  With
+``tol`` set the sweep stops early once adding a cluster improves WCSS by
+less than that fraction ``patience`` times in a row.
+"""
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+_shared = {}
+
+
+class ElbowResult:
+    """Outcome of :func:`elbow_sweep`."""
+
+    def __init__(self, ks, wcss, models, knee):
+        self.ks = ks
+        self.wcss = wcss
+        self.models = models
+        self.knee = knee
+
+    @property
+    def best_model(self):
+        return self.models[self.knee]
+
+    def __repr__(self):
+        return f"ElbowResult(ks={self.ks}, knee={self.knee})"
+
+
+def find_knee(ks, wcss):
+    """Return the k farthest from the chord joining the curve's end points."""
+    ks = np.asarray(ks, dtype=float)
+    wcss = np.asarray(wcss, dtype=float)
+    if len(ks) < 3:
+        return int(ks[-1])
+
+    x = (ks - ks[0]) / (ks[-1] - ks[0])
+    span = wcss[0] - wcss[-1]
+    y = (wcss - wcss[-1]) / span if span > 0 else np.zeros_like(wcss)
+
+    # Chord runs from (0, 1) to (1, 0); distance is proportional to |x + y - 1|.
+    distance = np.abs(x + y - 1)
+    return int(ks[np.argmax(distance)])
+
+
+def _make_model(k, method, random_state, batch_size):
+    if method == "minibatch":
+        return MiniBatchKMeans(n_clusters=k, random_state=random_state, batch_size=batch_size)
+    if method == "kmeans":
+        return KMeans(n_clusters=k, random_state=random_state)
+    raise ValueError(f"Unknown method: {method!r}")
+
+
+def _attach(name, shape, dtype):
+    # Workers share the parent's resource tracker, which unlinks the block.
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        shm = shared_memory.SharedMemory(name=name)
+    X = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    X.flags.writeable = False
+    _shared["shm"] = shm
+    _shared["X"] = X
+
+
+def _fit_shared(k, method, random_state, batch_size):
+    model = _make_model(k, method, random_state, batch_size)
+    model.fit(_shared["X"])
+    return model
+
+
+def elbow_sweep(X, k_range=range(1, 11), method="kmeans", n_jobs=None, random_state=42,
+                batch_size=1024, tol=None, patience=2):
+    """Fit one model per k and return an :class:`ElbowResult`.
+
+    ``n_jobs`` defaults to the CPU count; ``n_jobs=1`` fits in-process.
+    """
+    ks = sorted(k_range)
+    if not ks or ks[0] < 1:
+        raise ValueError("k_range must contain positive cluster counts")
+
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(ks))
+
+    models = {}
+    wcss = []
+
+    def accept(k, model):
+        models[k] = model
+        wcss.append(model.inertia_)
+        if tol is None or len(wcss) <= patience:
+            return True
+        drops = [(wcss[i - 1] - wcss[i]) / wcss[i - 1] if wcss[i - 1] > 0 else 0.0
+                 for i in range(len(wcss) - patience, len(wcss))]
+        return not all(d < tol for d in drops)
+
+    if n_jobs == 1:
+        for k in ks:
+            model = _make_model(k, method, random_state, batch_size).fit(X)
+            if not accept(k, model):
+                break
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+        try:
+            np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)[...] = X
+            # Forked workers do not re-run the calling script (k_meanselbow.py
+            # is a notebook export without a __main__ guard).
+            context = multiprocessing.get_context("fork") if sys.platform.startswith("linux") else None
+            with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context, initializer=_attach,
+                                     initargs=(shm.name, X.shape, X.dtype)) as executor:
+                futures = [executor.submit(_fit_shared, k, method, random_state, batch_size)
+                           for k in ks]
+                for k, future in zip(ks, futures):
+                    if not accept(k, future.result()):
+                        for pending in futures:
+                            pending.cancel()
+                        break
+        finally:
+            shm.close()
+            shm.unlink()
+
+    fitted = list(models)
+    return ElbowResult(fitted, wcss, models, find_knee(fitted, wcss))
@@ -9,10 +9,10 @@ Original file is located at
 
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.preprocessing import StandardScaler
+from elbow import elbow_sweep
 
 df=pd.read_csv('/content/Mall_Customers.csv')
 df.head()
@@ -29,26 +29,24 @@ x=df[['Annual Income (k$)','Spending Score (1-100)']]
 scalar=StandardScaler()
 x_scaled=scalar.fit_transform(x)
 
-k_mean=KMeans(n_clusters=5,random_state=42)
-k_mean.fit(x_scaled)
-
-wcss=[]
-for i in range(1,11):
-  kmean=KMeans(n_clusters=i,random_state=42)
-  kmean.fit(x_scaled)
-  wcss.append(kmean.inertia_)
+# Fit k=1..10 in parallel; pass method='minibatch' for large customer files
+sweep=elbow_sweep(x_scaled,k_range=range(1,11),random_state=42)
+wcss=sweep.wcss
 print("Wcss value:",wcss)
-plt.plot(range(1,11),wcss,marker='o')
+print("Knee at k =",sweep.knee)
+plt.plot(sweep.ks,wcss,marker='o')
+plt.axvline(sweep.knee,linestyle='--',color='grey')
 plt.xlabel('Number of Clusters')
 plt.ylabel('WCSS')
 plt.show()
 
-k_mean=KMeans(n_clusters=5,random_state=42)
-df['Cluster']=k_mean.fit_predict(x_scaled)
+# Reuse the model fitted during the sweep instead of refitting
+k_mean=sweep.best_model
+df['Cluster']=k_mean.labels_
 df.head()
 
 plt.figure(figsize=(8,6))
-for cluster in range(5):
+for cluster in range(k_mean.n_clusters):
   plt.scatter(
      df[df['Cluster']==cluster]['Annual Income (k$)'],
      df[df['Cluster']==cluster]['Spending Score (1-100)'],
@@ -59,6 +57,16 @@ plt.ylabel('Spending Score (1-100)')
 plt.legend()
 plt.show()
 
+import os
+import sys
 import joblib
-joblib.dump(scalar,'scalar.pkl')
-joblib.dump(k_mean,'cluster_model.pkl')
\ No newline at end of file
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+joblib.dump(scalar,os.path.join(BASE_DIR,'scalar.pkl'))
+joblib.dump(k_mean,os.path.join(BASE_DIR,'cluster_model.pkl'))
+
+# The app loads bundle/, so publish the retrained model there as well
+sys.path.append(os.path.dirname(BASE_DIR))
+from common.build_bundles import build_kmeans
+build_kmeans(BASE_DIR)
+# New customers can then be folded in without retraining:
+#   python online_kmeans.py new_customers.csv
\ No newline at end of file
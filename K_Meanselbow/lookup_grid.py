@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Precomputed cluster-assignment grid for the 2-D segmentation model.
+
+The (income, spending score) domain is cut into a regular grid and the
+K-Means label of every grid node is computed once.  A cell whose four
+corners share a label lies entirely inside that cluster's region (K-Means
+regions are convex and ``StandardScaler`` is an affine map), so the label is
+stored as a ``uint8``; cells that straddle a boundary are marked
+``BOUNDARY`` and those points, like any outside the grid, fall back to the
+real scaler + model.  Lookups therefore always agree with
+``kmeans.predict(scaler.transform(X))``.
+
+The grid is optional: the app and the HTTP adapter use it only with
+``KMEANS_LOOKUP_GRID=1``.  It is built in memory from the loaded model (a
+few milliseconds), so it can never go stale when the bundle is republished.
+``tests/test_lookup_grid.py`` checks it against ``kmeans.predict``.
+"""
+
+import threading
+
+import numpy as np
+
+BOUNDARY = 255
+
+INCOME_RANGE = (0.0, 150.0)
+SCORE_RANGE = (0.0, 100.0)
+RESOLUTION = 0.5
+
+
+class AssignmentGrid:
+    """O(1) cluster lookup with exact model fallback near boundaries."""
+
+    def __init__(self, cells, origin, step, kmeans=None, scaler=None):
+        self.cells = np.asarray(cells, dtype=np.uint8)
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.step = np.asarray(step, dtype=np.float64)
+        self.kmeans = kmeans
+        self.scaler = scaler
+
+    @classmethod
+    def build(cls, kmeans, scaler, x_range=INCOME_RANGE, y_range=SCORE_RANGE,
+              resolution=RESOLUTION):
+        if kmeans.n_clusters >= BOUNDARY:
+            raise ValueError(f"At most {BOUNDARY} clusters fit in a uint8 grid")
+
+        nx = int(round((x_range[1] - x_range[0]) / resolution))
+        ny = int(round((y_range[1] - y_range[0]) / resolution))
+        xs = np.linspace(x_range[0], x_range[1], nx + 1)
+        ys = np.linspace(y_range[0], y_range[1], ny + 1)
+
+        gx, gy = np.meshgrid(xs, ys, indexing="ij")
+        nodes = np.column_stack([gx.ravel(), gy.ravel()])
+        node_labels = kmeans.predict(scaler.transform(nodes)).reshape(nx + 1, ny + 1)
+
+        corner = node_labels[:-1, :-1]
+        uniform = ((corner == node_labels[1:, :-1])
+                   & (corner == node_labels[:-1, 1:])
+                   & (corner == node_labels[1:, 1:]))
+        cells = np.where(uniform, corner, BOUNDARY).astype(np.uint8)
+
+        step = ((x_range[1] - x_range[0]) / nx, (y_range[1] - y_range[0]) / ny)
+        return cls(cells, (x_range[0], y_range[0]), step, kmeans, scaler)
+
+    @property
+    def extent(self):
+        """``(x0, x1, y0, y1)`` covered by the grid."""
+        x1, y1 = self.origin + self.step * self.cells.shape
+        return self.origin[0], x1, self.origin[1], y1
+
+    @property
+    def boundary_fraction(self):
+        return float(np.mean(self.cells == BOUNDARY))
+
+    def lookup(self, X):
+        """Grid labels for ``X``; ``BOUNDARY`` where the grid cannot decide."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, 2)
+        idx = np.floor((X - self.origin) / self.step).astype(np.intp)
+        inside = ((idx >= 0) & (idx < self.cells.shape)).all(axis=1)
+
+        labels = np.full(len(X), BOUNDARY, dtype=np.uint8)
+        labels[inside] = self.cells[idx[inside, 0], idx[inside, 1]]
+        return labels
+
+    def predict(self, X):
+        """Cluster labels for raw (income, score) rows, identical to the model."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, 2)
+        labels = self.lookup(X).astype(np.int32)
+
+        fallback = labels == BOUNDARY
+        if fallback.any():
+            if self.kmeans is None or self.scaler is None:
+                raise ValueError("Grid has no model attached for boundary fallback")
+            labels[fallback] = self.kmeans.predict(self.scaler.transform(X[fallback]))
+        return labels
+
+    def region_image(self):
+        """Per-cell labels for plotting, with boundary cells resolved by the model."""
+        if not (self.cells == BOUNDARY).any():
+            return self.cells.astype(np.int32)
+        nx, ny = self.cells.shape
+        xs = self.origin[0] + (np.arange(nx) + 0.5) * self.step[0]
+        ys = self.origin[1] + (np.arange(ny) + 0.5) * self.step[1]
+        image = self.cells.astype(np.int32)
+        bx, by = np.nonzero(self.cells == BOUNDARY)
+        image[bx, by] = self.predict(np.column_stack([xs[bx], ys[by]]))
+        return image
+
+
+_current = None
+_current_lock = threading.Lock()
+
+
+def get_grid(kmeans, scaler):
+    """Return the grid for this model/scaler pair, building it once.
+
+    The last grid is kept per (model, scaler) object, so when the registry
+    reloads either pickle a fresh grid is built on the next call.
+    """
+    global _current
+    with _current_lock:
+        if _current is None or _current[0] is not kmeans or _current[1] is not scaler:
+            _current = (kmeans, scaler, AssignmentGrid.build(kmeans, scaler))
+        return _current[2]
+
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""Incremental re-segmentation from new batches of customers.
+
+Instead of refitting ``StandardScaler`` and ``KMeans`` on the whole customer
+file (``k_meanselbow.py``), each new mini-batch
+
+1. updates the scaler's running mean and variance (``partial_fit``);
+2. re-expresses the current centroids in the updated scaled space, so the
+   model keeps describing the same customers;
+3. moves the centroids with ``MiniBatchKMeans.partial_fit``; and
+4. matches the new centroids to the previous ones (Hungarian assignment on
+   raw income / score distance) and relabels them, so "Cluster 3" means
+   the same segment before and after the update.
+
+History is carried in the per-cluster sample counts: the model is seeded
+from the previous centroids weighted by those counts, so a 50-row batch
+nudges a segment built from thousands of customers instead of replacing it.
+Random centroid reassignment is disabled for the same reason.
+
+Every update is published as a new version of ``bundle/`` (``kmeans``,
+``scaler`` and ``counts`` members, ``model_version`` incremented).  The
+manifest is swapped atomically, and the app loads the bundle through the
+shared registry, so a running app serves the new segments on its next rerun
+without a restart.  The first update converts the batch-trained
+``KMeans`` into a ``MiniBatchKMeans`` with the same centroids and IDs.
+
+Usage::
+
+    python online_kmeans.py new_customers.csv
+    python online_kmeans.py stream.csv --batch-size 256 --publish-every 4
+
+Only one updater should run against a bundle at a time.  Once online updates
+have been published, the bundle is the source of truth:
+``python -m common.build_bundles kmeans`` would reset it to the pickles.
+"""
+
+import argparse
+import copy
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from common.bundle import Bundle, bundle_path, has_bundle, write_bundle
+
+FEATURES = ["Annual Income (k$)", "Spending Score (1-100)"]
+DEFAULT_BATCH_SIZE = 256
+
+
+def _frame(X):
+    return X[FEATURES] if isinstance(X, pd.DataFrame) else pd.DataFrame(X, columns=FEATURES)
+
+
+def seeded_model(centers, counts, random_state=0, batch_size=DEFAULT_BATCH_SIZE):
+    """``MiniBatchKMeans`` at ``centers`` that has already "seen" ``counts`` samples each.
+
+    One ``partial_fit`` on the centers themselves, weighted by the counts,
+    leaves every center in place and sets its running weight.
+    """
+    centers = np.asarray(centers, dtype=np.float64)
+    model = MiniBatchKMeans(n_clusters=len(centers), init=centers, n_init=1,
+                            batch_size=batch_size, reassignment_ratio=0.0,
+                            compute_labels=False, random_state=random_state)
+    return model.partial_fit(centers, sample_weight=np.asarray(counts, dtype=np.float64))
+
+
+def match_clusters(previous, current):
+    """Permutation ``p`` such that ``current[p]`` lines up with ``previous``."""
+    cost = ((previous[:, None, :] - current[None, :, :]) ** 2).sum(axis=2)
+    rows, cols = linear_sum_assignment(cost)
+    return cols[np.argsort(rows)]
+
+
+class OnlineSegmenter:
+    """Scaler + centroids that are updated batch by batch."""
+
+    def __init__(self, kmeans, scaler, counts, model_version=0, samples_seen=None):
+        self.kmeans = kmeans
+        self.scaler = scaler
+        self.counts = np.asarray(counts, dtype=np.float64)
+        self.model_version = model_version
+        self.samples_seen = int(scaler.n_samples_seen_ if samples_seen is None else samples_seen)
+
+    @classmethod
+    def from_models(cls, kmeans, scaler, counts=None, model_version=0):
+        """Start from any fitted K-Means (the batch ``KMeans`` counts its ``labels_``)."""
+        if counts is None:
+            counts = np.bincount(kmeans.labels_, minlength=kmeans.n_clusters)
+        return cls(seeded_model(kmeans.cluster_centers_, counts), copy.deepcopy(scaler), counts,
+                   model_version)
+
+    @classmethod
+    def from_bundle(cls, path):
+        bundle = Bundle(path, mmap_mode=None, object_mmap_mode=None)
+        counts = bundle.get("counts")
+        return cls.from_models(bundle["kmeans"], bundle["scaler"],
+                               None if counts is None else np.array(counts),
+                               bundle.model_version or 0)
+
+    @classmethod
+    def from_batch(cls, X, n_clusters, random_state=0):
+        """Cold start: scaler and k-means++ centroids from a first batch."""
+        X = _frame(X)
+        scaler = StandardScaler().fit(X)
+        model = MiniBatchKMeans(n_clusters=n_clusters, n_init=3, reassignment_ratio=0.0,
+                                compute_labels=False, random_state=random_state)
+        Xs = scaler.transform(X)
+        model.partial_fit(Xs)
+        counts = np.bincount(model.predict(Xs), minlength=n_clusters)
+        return cls(seeded_model(model.cluster_centers_, counts), scaler, counts, model_version=1)
+
+    @property
+    def centers(self):
+        """Centroids in raw (income, spending score) units."""
+        return self.scaler.inverse_transform(self.kmeans.cluster_centers_)
+
+    def update(self, X):
+        """Fold one batch of customers in; returns how far each centroid moved (raw units)."""
+        X = _frame(X)
+        previous = self.centers
+
+        # Updated scaler; old centroids re-expressed in its space
+        scaler = copy.deepcopy(self.scaler).partial_fit(X)
+        centers = scaler.transform(pd.DataFrame(previous, columns=FEATURES))
+        model = seeded_model(centers, self.counts, batch_size=max(len(X), 1))
+
+        Xs = scaler.transform(X)
+        counts = self.counts + np.bincount(model.predict(Xs), minlength=len(self.counts))
+        model.partial_fit(Xs)
+
+        order = match_clusters(previous, scaler.inverse_transform(model.cluster_centers_))
+        if not np.array_equal(order, np.arange(len(order))):
+            model = seeded_model(model.cluster_centers_[order], counts[order])
+            counts = counts[order]
+
+        self.kmeans, self.scaler, self.counts = model, scaler, counts
+        self.samples_seen += len(X)
+        self.model_version += 1
+        return np.linalg.norm(self.centers - previous, axis=1)
+
+    def predict(self, X):
+        return self.kmeans.predict(self.scaler.transform(_frame(X)))
+
+    def publish(self, path, **metadata):
+        """Write this state as the next bundle version (atomic manifest swap)."""
+        return write_bundle(path, {"kmeans": self.kmeans, "scaler": self.scaler,
+                                   "counts": self.counts},
+                            features=FEATURES, model_version=self.model_version,
+                            metadata={"samples_seen": self.samples_seen,
+                                      "cluster_sizes": self.counts.tolist(), **metadata})
+
+
+def load_segmenter(base_dir=BASE_DIR, bundle=None):
+    """The published state: ``bundle`` (default ``base_dir/bundle``) if present,
+    else the batch-trained pickles in ``base_dir``."""
+    import joblib
+
+    bundle = bundle or bundle_path(base_dir)
+    if has_bundle(bundle):
+        return OnlineSegmenter.from_bundle(bundle)
+    return OnlineSegmenter.from_models(joblib.load(os.path.join(base_dir, "cluster_model.pkl")),
+                                       joblib.load(os.path.join(base_dir, "scalar.pkl")))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update the customer segments from new rows.")
+    parser.add_argument("input", help="CSV with 'Annual Income (k$)' and 'Spending Score (1-100)'")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="rows per partial_fit step (default: %(default)s)")
+    parser.add_argument("--publish-every", type=int, default=1,
+                        help="publish a bundle version every N batches (default: %(default)s)")
+    parser.add_argument("--bundle", default=bundle_path(BASE_DIR),
+                        help="bundle to update (default: %(default)s)")
+    parser.add_argument("--clusters", type=int, default=5,
+                        help="clusters for a cold start without a model (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    base_dir = os.path.dirname(os.path.abspath(args.bundle))
+    fresh = not has_bundle(args.bundle) and not os.path.exists(
+        os.path.join(base_dir, "cluster_model.pkl"))
+    segmenter = None if fresh else load_segmenter(base_dir, bundle=args.bundle)
+
+    pending = 0
+    for batch in pd.read_csv(args.input, usecols=FEATURES, chunksize=args.batch_size):
+        if segmenter is None:
+            segmenter = OnlineSegmenter.from_batch(batch, args.clusters)
+            shift = np.zeros(args.clusters)
+        else:
+            shift = segmenter.update(batch)
+        pending += 1
+        if pending >= args.publish_every:
+            segmenter.publish(args.bundle, source=os.path.basename(args.input))
+            pending = 0
+        print(f"version {segmenter.model_version}: {len(batch)} rows, "
+              f"{segmenter.samples_seen} seen, max centroid shift {shift.max():.3f}")
+
+    if segmenter is not None and pending:
+        segmenter.publish(args.bundle, source=os.path.basename(args.input))
+    if segmenter is not None:
+        print(f"Published {args.bundle} version {segmenter.model_version}; "
+              f"cluster sizes {segmenter.counts.astype(int).tolist()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,42 @@
 import streamlit as st
-import pandas as pd
-import joblib
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from common import metrics
+from common.batching import get_batcher
+from common.startup import FAST_START, prewarm
+
+
+def load_predictor():
+    """``(predictor, model_sources)``; the artifacts come from the shared registry."""
+    from common.bundle import bundle_path, has_bundle, load_bundle
+    from common.registry import load_artifact
+    from fast_predict import PerformancePredictor, get_predictor
+
+    model_bundle = bundle_path(BASE_DIR)
+    if has_bundle(model_bundle):
+        # Packed trees memory-mapped from the bundle; shared by every worker
+        return (load_bundle(model_bundle, derive=PerformancePredictor.from_bundle),
+                [model_bundle])
+    model = load_artifact(os.path.join(BASE_DIR, "random_forest_model.pkl"))
+    le = load_artifact(os.path.join(BASE_DIR, "label_encoder.pkl"))
+    # Column order is validated once here; predictions then use float32 buffers
+    return (get_predictor(model, le),
+            [os.path.join(BASE_DIR, "random_forest_model.pkl"),
+             os.path.join(BASE_DIR, "label_encoder.pkl")])
+
+
+def warm_up(loaded):
+    import numpy as np
+
+    predictor, _ = loaded
+    predictor.predict_proba(np.zeros((1, len(predictor.columns)), dtype=np.float32))
+
 
 # --------------------------------
 # Page Config
@@ -62,8 +98,11 @@ st.markdown("<h1>🚀 AI Employee Performance Predictor</h1>", unsafe_allow_html
 # --------------------------------
 # Load Model
 # --------------------------------
-model = joblib.load("random_forest_model.pkl")
-le = joblib.load("label_encoder.pkl")
+if FAST_START:
+    # Loaded and warmed up in the background while the page renders
+    prewarm("team_a", load_predictor, warm_up)
+else:
+    load_predictor()
 
 # --------------------------------
 # Layout
@@ -87,9 +126,6 @@ with col1:
 
     predict_button = st.button("Predict with AI 🚀")
 
-# Encode department
-dept_encoded = le.transform([department])[0]
-
 # ---------------- RIGHT PANEL ----------------
 with col2:
     st.markdown(
@@ -98,19 +134,31 @@ with col2:
     )
 
     if predict_button:
-
-        input_data = pd.DataFrame({
-            "Age": [age],
-            "Experience_Years": [experience],
-            "Department": [dept_encoded],
-            "Salary": [salary],
-            "Work_Hours": [work_hours],
-            "Projects_Handled": [projects],
-            "Training_Hours": [training]
-        })
-
-        prediction = model.predict(input_data)
-        probability = model.predict_proba(input_data)
+        from common.prediction_cache import get_cache, model_key
+
+        # Cached by the registry; waits for the prewarm thread if it is still loading
+        predictor, model_sources = load_predictor()
+        with metrics.profile("team_a"):
+            with metrics.stage("team_a", "encode"):
+                input_data = predictor.encode_row(
+                    Age=age,
+                    Experience_Years=experience,
+                    Department=department,
+                    Salary=salary,
+                    Work_Hours=work_hours,
+                    Projects_Handled=projects,
+                    Training_Hours=training
+                )
+
+            # Cached per (model files, inputs); misses from concurrent sessions
+            # run as one forest call
+            with metrics.stage("team_a", "predict"):
+                probability = get_cache().get(
+                    model_key("team_a", *model_sources),
+                    input_data,
+                    get_batcher("team_a.forest", predictor.predict_proba).predict
+                )
+        prediction = predictor.classes[probability.argmax(axis=1)]
 
         if prediction[0] == 1:
             st.success("⭐ High Performance Employee")
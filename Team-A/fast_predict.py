@@ -0,0 +1,136 @@
+"""Fast inference adapter for the Team-A performance RandomForest.
+
+The column order is checked once against ``feature_names_in_`` when the
+adapter is built.  After that, rows are written straight into reusable
+C-contiguous float32 buffers (the dtype the trees compare in), so no
+DataFrame is built and sklearn has nothing to convert.  The class label is
+taken from the ``predict_proba`` output, so the forest is walked once per
+prediction instead of twice.
+
+Forests are evaluated by :class:`forest_engine.PackedForest`, which gives
+the same probabilities bit for bit; set ``TEAM_A_PACKED_FOREST=0`` to use
+sklearn's own ``predict_proba`` instead.
+
+The artifact bundle (:func:`bundle_members`) holds the packed forest arrays
+next to the estimator, so a predictor built from it memory-maps the trees
+and never unpickles the sklearn model.
+"""
+
+import copy
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from common.encoding import CategoryTable
+
+from forest_engine import PackedForest
+
+USE_PACKED_FOREST = os.environ.get("TEAM_A_PACKED_FOREST", "1") != "0"
+
+# Order of the inputs collected by app.py
+INPUT_COLUMNS = ["Age", "Experience_Years", "Department", "Salary",
+                 "Work_Hours", "Projects_Handled", "Training_Hours"]
+CATEGORICAL_COLUMN = "Department"
+
+
+class PerformancePredictor:
+    """Validated, allocation-free wrapper around the fitted forest."""
+
+    def __init__(self, model, encoder, columns=INPUT_COLUMNS, packed=USE_PACKED_FOREST):
+        fitted = list(getattr(model, "feature_names_in_", columns))
+        if sorted(fitted) != sorted(columns):
+            raise ValueError(f"Model expects columns {fitted}, adapter was given {list(columns)}")
+
+        self.columns = fitted
+        self.classes = model.classes_
+        # LabelEncoder compiled once into a lookup table
+        self.departments = CategoryTable.from_label_encoder(encoder, name=CATEGORICAL_COLUMN)
+        self._department_index = fitted.index(CATEGORICAL_COLUMN)
+
+        # Order is validated above, so predict on plain arrays without
+        # sklearn re-checking feature names on every call.
+        self.model = copy.copy(model)
+        if hasattr(self.model, "feature_names_in_"):
+            del self.model.feature_names_in_
+
+        self.engine = self.model
+        if packed and hasattr(model, "estimators_"):
+            self.engine = PackedForest.from_estimator(model)
+
+        self._local = threading.local()
+
+    @classmethod
+    def from_bundle(cls, bundle, packed=USE_PACKED_FOREST):
+        """Predictor over the packed forest (or estimator) stored in a bundle."""
+        model = PackedForest.from_bundle(bundle) if packed else bundle["model"]
+        return cls(model, bundle["label_encoder"], columns=bundle.features, packed=packed)
+
+    def _row_buffer(self):
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.empty((1, len(self.columns)), dtype=np.float32)
+        return row
+
+    def encode_row(self, **values):
+        """Fill this thread's row buffer from keyword inputs (raw department name)."""
+        row = self._row_buffer()
+        for j, column in enumerate(self.columns):
+            value = values[column]
+            if j == self._department_index:
+                value = self.departments.code(value)
+            row[0, j] = value
+        return row
+
+    def predict_proba(self, X):
+        return self.engine.predict_proba(X)
+
+    def predict(self, X):
+        """Return ``(labels, probabilities)`` from a single forest pass."""
+        probability = self.engine.predict_proba(X)
+        return self.classes[probability.argmax(axis=1)], probability
+
+    def encode_table(self, df):
+        """Encode a whole employee table into a contiguous float32 matrix."""
+        missing = [c for c in self.columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"Table is missing columns: {missing}")
+
+        departments = self.departments.encode(df[CATEGORICAL_COLUMN].to_numpy())
+        X = np.empty((len(df), len(self.columns)), dtype=np.float32)
+        for j, column in enumerate(self.columns):
+            if j == self._department_index:
+                X[:, j] = departments
+            else:
+                X[:, j] = df[column].to_numpy()
+        return X
+
+    def predict_table(self, df):
+        """Score a DataFrame of raw employee rows in one batched call."""
+        labels, probability = self.predict(self.encode_table(df))
+        return pd.DataFrame({
+            "Prediction": labels,
+            "HighPerformanceProbability": probability[:, list(self.classes).index(1)],
+        }, index=df.index)
+
+
+def bundle_members(model, encoder):
+    """``(members, features)`` for :func:`common.bundle.write_bundle`."""
+    members = {f"forest.{name}": array
+               for name, array in PackedForest.from_estimator(model).arrays().items()}
+    members.update(model=model, label_encoder=encoder)
+    return members, list(getattr(model, "feature_names_in_", INPUT_COLUMNS))
+
+
+_current = None
+_current_lock = threading.Lock()
+
+
+def get_predictor(model, encoder):
+    """Return the adapter for this model/encoder pair, building it once."""
+    global _current
+    with _current_lock:
+        if _current is None or _current[0] is not model or _current[1] is not encoder:
+            _current = (model, encoder, PerformancePredictor(model, encoder))
+        return _current[2]
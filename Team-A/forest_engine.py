@@ -0,0 +1,206 @@
+"""Packed-array inference engine for the Team-A RandomForest.
+
+:func:`export_forest` flattens every fitted tree into shared NumPy node
+arrays (feature, threshold, left/right child, per-leaf class probabilities)
+with global node offsets.  :class:`PackedForest` then walks *all* trees for a
+batch of rows at once: one vectorized step per tree level instead of
+sklearn's per-estimator Python loop.  Traversal can be split across threads
+by tree shard; leaf probabilities are always accumulated in estimator order
+with the same float64 arithmetic as ``RandomForestClassifier.predict_proba``,
+so results are bit-for-bit identical (``tests/test_forest_engine.py``).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+LEAF = -1
+DEFAULT_BLOCK_SIZE = 256
+
+
+def export_forest(forest):
+    """Return a dict of packed node arrays for a fitted forest classifier."""
+    if getattr(forest, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests are supported")
+
+    n_classes = int(forest.n_classes_)
+    features, thresholds, lefts, rights, values, missing_left = [], [], [], [], [], []
+    roots, depths = [], []
+    offset = 0
+
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        node_ids = np.arange(n, dtype=np.int64)
+        is_leaf = tree.children_left == LEAF
+
+        # Leaves point at themselves, so extra traversal steps are no-ops.
+        left = np.where(is_leaf, node_ids, tree.children_left) + offset
+        right = np.where(is_leaf, node_ids, tree.children_right) + offset
+        feature = np.where(is_leaf, 0, tree.feature)
+
+        # Same normalisation as DecisionTreeClassifier.predict_proba
+        value = tree.value[:, 0, :n_classes].astype(np.float64)
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        value = value / normalizer
+
+        mgl = getattr(tree, "missing_go_to_left", None)
+        missing_left.append(np.zeros(n, dtype=bool) if mgl is None else np.asarray(mgl, dtype=bool))
+
+        features.append(feature.astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(left.astype(np.int32))
+        rights.append(right.astype(np.int32))
+        values.append(value)
+        roots.append(offset)
+        depths.append(tree.max_depth)
+        offset += n
+
+    return {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.concatenate(values),
+        "missing_go_to_left": np.concatenate(missing_left),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "max_depth": np.int32(max(depths)),
+        "classes": np.asarray(forest.classes_),
+        "n_features": np.int32(forest.n_features_in_),
+    }
+
+
+class PackedForest:
+    """Vectorized evaluation of an exported forest.
+
+    Rows are processed in blocks of ``block_size``; with ``n_jobs > 1`` the
+    trees of each block are split into ``shards`` traversed on a thread pool
+    (worthwhile for deep forests and large batches).
+    """
+
+    def __init__(self, arrays, n_jobs=1, shards=None, block_size=DEFAULT_BLOCK_SIZE):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.missing_go_to_left = arrays["missing_go_to_left"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.classes = arrays["classes"]
+        self.n_features = int(arrays["n_features"])
+        self.n_jobs = int(n_jobs)
+        self.shards = shards or self.n_jobs
+        self.block_size = int(block_size)
+
+        # Interleaved (left, right) pairs: the next node is one ``take``
+        # at ``2 * node + went_right``.  Bundles store it ready-made.
+        self._children = arrays.get("children")
+        if self._children is None:
+            self._children = np.empty(2 * len(self.left), dtype=np.int32)
+            self._children[0::2] = self.left
+            self._children[1::2] = self.right
+
+    @property
+    def classes_(self):
+        return self.classes
+
+    @classmethod
+    def from_estimator(cls, forest, **options):
+        return cls(export_forest(forest), **options)
+
+    @classmethod
+    def from_bundle(cls, bundle, prefix="forest", **options):
+        """Forest from the ``prefix.*`` members of a :class:`common.bundle.Bundle`."""
+        return cls(bundle.group(prefix), **options)
+
+    def arrays(self):
+        """All packed arrays by name, as stored in a bundle."""
+        return {
+            "feature": self.feature, "threshold": self.threshold, "left": self.left,
+            "right": self.right, "value": self.value,
+            "missing_go_to_left": self.missing_go_to_left, "roots": self.roots,
+            "max_depth": np.asarray(self.max_depth, dtype=np.int32),
+            "classes": np.asarray(self.classes),
+            "n_features": np.asarray(self.n_features, dtype=np.int32),
+            "children": self._children,
+        }
+
+    def save(self, path):
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left,
+                 right=self.right, value=self.value,
+                 missing_go_to_left=self.missing_go_to_left, roots=self.roots,
+                 max_depth=self.max_depth, classes=self.classes, n_features=self.n_features)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None, **options):
+        data = np.load(path, mmap_mode=mmap_mode)
+        return cls({key: data[key] for key in data.files}, **options)
+
+    def _check(self, X):
+        # Trees compare float32 inputs against float64 thresholds, as sklearn does.
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        return X
+
+    def _leaves(self, XT, roots):
+        """Leaf node index for every (tree in ``roots``, row) pair.
+
+        ``XT`` is the feature-major transpose of the block, so the gather
+        below reads ``XT[feature, row]`` from one flat buffer.
+        """
+        n = XT.shape[1]
+        flat = XT.ravel()
+        rows = np.arange(n)
+        node = np.repeat(np.asarray(roots, dtype=np.int32)[:, np.newaxis], n, axis=1)
+        has_nan = np.isnan(flat).any()
+
+        for _ in range(self.max_depth):
+            x = flat.take(self.feature.take(node) * n + rows)
+            go_right = ~(x <= self.threshold.take(node))
+            if has_nan:
+                go_right &= ~(np.isnan(x) & self.missing_go_to_left.take(node))
+            node = self._children.take(2 * node + go_right)
+        return node
+
+    def _apply_block(self, X, executor=None):
+        XT = np.ascontiguousarray(X.T)
+        shards = [s for s in np.array_split(self.roots, max(1, self.shards)) if len(s)]
+        if executor is not None and len(shards) > 1:
+            parts = list(executor.map(lambda roots: self._leaves(XT, roots), shards))
+        else:
+            parts = [self._leaves(XT, roots) for roots in shards]
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+    def _blocks(self, X, fn):
+        X = self._check(X)
+        blocks = [X[i:i + self.block_size] for i in range(0, len(X), self.block_size)] or [X]
+        # A pool only pays off once there is more than one block of work.
+        if self.n_jobs > 1 and len(blocks) > 1:
+            with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+                return [fn(block, executor) for block in blocks]
+        return [fn(block) for block in blocks]
+
+    def apply(self, X):
+        """Global leaf indices, shape ``(n_rows, n_trees)``."""
+        return np.concatenate(self._blocks(X, self._apply_block), axis=1).T
+
+    def _proba_block(self, X, executor=None):
+        leaves = self._apply_block(X, executor)
+        # Reducing over the leading (tree) axis adds whole slices one tree at
+        # a time, i.e. in estimator order, so the sum matches sklearn's
+        # sequential accumulation bit for bit.
+        return self.value.take(leaves, axis=0).sum(axis=0)
+
+    def predict_proba(self, X):
+        proba = np.concatenate(self._blocks(X, self._proba_block))
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
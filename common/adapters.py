@@ -0,0 +1,277 @@
+# =========================================
+# Headless Inference Adapters
+# =========================================
+"""The five apps' prediction paths, without Streamlit.
+
+Each adapter resolves its artifacts through the shared registry on every
+call, as :class:`model_pool.ModelPool` does, so a long-running server picks
+up a republished bundle or pickle without a restart.  Adapters expose
+
+* ``features`` – input columns, in order;
+* ``prepare(instances)`` – JSON rows (lists in feature order, or objects
+  keyed by feature name) to a float matrix, raising ``ValueError`` on bad
+  input;
+* ``predict(X, **options)`` – one result dict per row.
+
+``prepare`` is timed as the ``encode`` stage and ``predict`` as ``scale``
+and ``predict`` in :mod:`common.metrics` (free unless metrics are enabled).
+
+Rows from several requests can be stacked and sent through ``predict`` in a
+single call, which is what the HTTP server's micro-batching relies on.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROJECT_DIRS = {
+    "featuresel": os.path.join(ROOT_DIR, "featuresel"),
+    "dbscan": os.path.join(ROOT_DIR, "dbscan"),
+    "finalpro": os.path.join(ROOT_DIR, "finalpro"),
+    "team_a": os.path.join(ROOT_DIR, "Team-A"),
+    "kmeans": os.path.join(ROOT_DIR, "K_Meanselbow"),
+}
+
+for _path in PROJECT_DIRS.values():
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+from common.encoding import CategoryTable
+from common.bundle import bundle_path, has_bundle, load_bundle
+from common.metrics import stage
+from common.registry import load_artifact
+
+
+def rows_to_matrix(instances, features, encoders=None):
+    """Turn JSON rows into a float matrix in ``features`` order.
+
+    ``encoders`` maps a column to a callable that converts raw values
+    (e.g. category strings) to numbers.
+    """
+    encoders = encoders or {}
+    if not isinstance(instances, list) or not instances:
+        raise ValueError("'instances' must be a non-empty list")
+
+    X = np.empty((len(instances), len(features)), dtype=np.float64)
+    for i, row in enumerate(instances):
+        if isinstance(row, dict):
+            missing = [f for f in features if f not in row]
+            if missing:
+                raise ValueError(f"Row {i} is missing features: {missing}")
+            values = [row[f] for f in features]
+        elif isinstance(row, (list, tuple)):
+            if len(row) != len(features):
+                raise ValueError(f"Row {i} has {len(row)} values, expected {len(features)}")
+            values = list(row)
+        else:
+            raise ValueError(f"Row {i} must be a list or an object")
+
+        for j, (feature, value) in enumerate(zip(features, values)):
+            encode = encoders.get(feature)
+            try:
+                X[i, j] = encode(value) if encode is not None else float(value)
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"Row {i}: invalid value for {feature!r}: {value!r}") from None
+    return X
+
+
+class FeatureselAdapter:
+    """Titanic survival through any of the seven feature-selection models."""
+
+    name = "featuresel"
+
+    def __init__(self):
+        from model_pool import ORIGINAL_FEATURES, get_pool
+
+        self.features = list(ORIGINAL_FEATURES)
+        self.pool = get_pool(PROJECT_DIRS["featuresel"])
+        self.methods = self.pool.names
+        sex = {"Male": 1, "Female": 0, "male": 1, "female": 0, 1: 1, 0: 0}
+        self.encoders = {"Sex": CategoryTable.from_mapping(sex, name="Sex")}
+
+    def prepare(self, instances):
+        with stage(self.name, "encode"):
+            return rows_to_matrix(instances, self.features, self.encoders)
+
+    def _predict_one(self, method, X):
+        model, project = self.pool.get(method)
+        with stage(f"{self.name}:{method}", "predict"):
+            return model.predict_proba(project(X))[:, 1]
+
+    def predict(self, X, method="Chi-Square"):
+        if method == "all":
+            probabilities = {m: self._predict_one(m, X) for m in self.methods}
+            return [{m: {"survived": int(p[i] >= 0.5), "probability": float(p[i])}
+                     for m, p in probabilities.items()} for i in range(len(X))]
+        if method not in self.methods:
+            raise ValueError(f"Unknown method {method!r}; choose from {self.methods + ['all']}")
+        probability = self._predict_one(method, X)
+        return [{"survived": int(p >= 0.5), "probability": float(p)} for p in probability]
+
+
+class DBSCANAdapter:
+    """Cluster assignment against the fitted DBSCAN core samples."""
+
+    name = "dbscan"
+    features = ["f1", "f2"]
+
+    def __init__(self):
+        from assign import DBSCANAssigner
+        from grid_index import GridIndex
+
+        self.index_type = (GridIndex if os.environ.get("DBSCAN_GRID_INDEX", "0") == "1"
+                           else DBSCANAssigner)
+        self._assigner()
+
+    def _assigner(self):
+        model_bundle = bundle_path(PROJECT_DIRS["dbscan"])
+        if has_bundle(model_bundle):
+            return load_bundle(model_bundle, derive=self.index_type.from_bundle)
+        return load_artifact(os.path.join(PROJECT_DIRS["dbscan"], "dbscan.pkl"),
+                             derive=self.index_type.from_estimator)
+
+    def prepare(self, instances):
+        with stage(self.name, "encode"):
+            return rows_to_matrix(instances, self.features)
+
+    def predict(self, X):
+        with stage(self.name, "predict"):
+            labels, distances = self._assigner().query(X)
+        # The grid index has no distance for points with no core sample nearby
+        return [{"cluster": int(label), "outlier": bool(label == -1),
+                 "distance": float(d) if np.isfinite(d) else None}
+                for label, d in zip(labels, distances)]
+
+
+class FinalproAdapter:
+    """Employee attrition probability and risk band."""
+
+    name = "finalpro"
+
+    def __init__(self):
+        from batch_score import THRESHOLD, risk_bands
+
+        self.threshold = THRESHOLD
+        self.risk_bands = risk_bands
+        self._pipeline()
+
+    def _pipeline(self):
+        """``(model, scaler, features, encoders)`` of the published bundle."""
+        from batch_score import load_manifest, load_pipeline
+
+        model, scaler, feature_names = load_pipeline(PROJECT_DIRS["finalpro"])
+        manifest = load_manifest(PROJECT_DIRS["finalpro"], feature_names)
+        encoders = {col: manifest.encoder[col]
+                    for col in feature_names if col in manifest.encoder}
+        return model, scaler, list(feature_names), encoders
+
+    @property
+    def features(self):
+        return self._pipeline()[2]
+
+    def prepare(self, instances):
+        _, _, features, encoders = self._pipeline()
+        with stage(self.name, "encode"):
+            return rows_to_matrix(instances, features, encoders)
+
+    def predict(self, X):
+        model, scaler, features, _ = self._pipeline()
+        with stage(self.name, "scale"):
+            X = scaler.transform(pd.DataFrame(X, columns=features))
+        with stage(self.name, "predict"):
+            probability = model.predict_proba(X)[:, 1]
+        risk = self.risk_bands(probability)
+        return [{"prediction": "Leave" if p >= self.threshold else "Stay",
+                 "probability": float(p), "risk": str(r)}
+                for p, r in zip(probability, risk)]
+
+
+class TeamAAdapter:
+    """Employee performance (RandomForest)."""
+
+    name = "team_a"
+
+    def __init__(self):
+        self._predictor()
+
+    def _predictor(self):
+        from fast_predict import PerformancePredictor, get_predictor
+
+        base_dir = PROJECT_DIRS["team_a"]
+        if has_bundle(bundle_path(base_dir)):
+            return load_bundle(bundle_path(base_dir), derive=PerformancePredictor.from_bundle)
+        model = load_artifact(os.path.join(base_dir, "random_forest_model.pkl"))
+        le = load_artifact(os.path.join(base_dir, "label_encoder.pkl"))
+        return get_predictor(model, le)
+
+    @property
+    def features(self):
+        return list(self._predictor().columns)
+
+    def prepare(self, instances):
+        predictor = self._predictor()
+        encoders = {"Department": predictor.departments}
+        with stage(self.name, "encode"):
+            return rows_to_matrix(instances, predictor.columns, encoders).astype(np.float32)
+
+    def predict(self, X):
+        with stage(self.name, "predict"):
+            labels, probability = self._predictor().predict(X)
+        return [{"high_performance": int(c == 1), "probability": float(p)}
+                for c, p in zip(labels, probability[:, 1])]
+
+
+class KMeansAdapter:
+    """Mall customer segment from income and spending score."""
+
+    name = "kmeans"
+    features = ["Annual Income (k$)", "Spending Score (1-100)"]
+
+    def __init__(self):
+        # Same toggle as the app
+        self.use_grid = os.environ.get("KMEANS_LOOKUP_GRID", "0") == "1"
+        self._models()
+
+    def _models(self):
+        base_dir = PROJECT_DIRS["kmeans"]
+        if has_bundle(bundle_path(base_dir)):
+            bundle = load_bundle(bundle_path(base_dir))
+            return bundle["kmeans"], bundle["scaler"]
+        return (load_artifact(os.path.join(base_dir, "cluster_model.pkl")),
+                load_artifact(os.path.join(base_dir, "scalar.pkl")))
+
+    def prepare(self, instances):
+        with stage(self.name, "encode"):
+            return rows_to_matrix(instances, self.features)
+
+    def predict(self, X):
+        kmeans, scaler = self._models()
+        if self.use_grid:
+            from lookup_grid import get_grid
+
+            # The lookup grid folds scaling into its cell boundaries; a new
+            # model gets a new grid
+            with stage(self.name, "predict"):
+                clusters = get_grid(kmeans, scaler).predict(X)
+        else:
+            with stage(self.name, "scale"):
+                X = scaler.transform(pd.DataFrame(X, columns=self.features))
+            with stage(self.name, "predict"):
+                clusters = kmeans.predict(X)
+        return [{"cluster": int(c)} for c in clusters]
+
+
+ADAPTERS = {
+    cls.name: cls
+    for cls in (FeatureselAdapter, DBSCANAdapter, FinalproAdapter, TeamAAdapter, KMeansAdapter)
+}
+
+
+def load_adapters(names=None):
+    """Instantiate adapters by name (all five by default)."""
+    names = list(ADAPTERS) if names is None else names
+    return {name: ADAPTERS[name]() for name in names}
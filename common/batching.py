@@ -0,0 +1,186 @@
+# =========================================
+# Request Micro-Batching
+# =========================================
+"""Collect concurrent single-row predict calls into one vectorized call.
+
+For sklearn models almost all of a one-row ``predict`` is fixed per-call
+overhead, so a :class:`MicroBatcher` holds requests for a model until it has
+``max_rows`` rows or the oldest request has waited ``max_wait_ms``, runs the
+wrapped function once on the stacked rows and hands each caller back its
+own slice.  Streamlit sessions are threads in one process, so
+:func:`get_batcher` shares one batcher per model across all sessions.
+
+Inputs may be NumPy arrays or pandas DataFrames; results must be sliceable
+along the first axis (arrays, DataFrames or lists).  The default latency
+budget and batch size can be set with ``PREDICT_BATCH_WAIT_MS`` and
+``PREDICT_BATCH_MAX_ROWS``.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from common import metrics
+
+DEFAULT_MAX_ROWS = int(os.environ.get("PREDICT_BATCH_MAX_ROWS", "64"))
+DEFAULT_MAX_WAIT_MS = float(os.environ.get("PREDICT_BATCH_WAIT_MS", "2.0"))
+
+
+class MicroBatcher:
+    """Background thread that batches calls to ``predict_fn``."""
+
+    def __init__(self, predict_fn, max_rows=DEFAULT_MAX_ROWS, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 executor=None, name=None):
+        if max_rows < 1:
+            raise ValueError("max_rows must be at least 1")
+        self.predict_fn = predict_fn
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.name = name or getattr(predict_fn, "__qualname__", "batcher")
+
+        self._pending = deque()
+        self._pending_rows = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._batches = 0
+        self._rows = 0
+        self._max_depth = 0
+        self._wait_total = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=f"batcher-{self.name}",
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, X):
+        """Queue rows for prediction and return a ``Future`` of their results."""
+        n = len(X)
+        future = Future()
+        if n == 0:
+            raise ValueError("Cannot submit an empty batch")
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.append((X, n, future, time.perf_counter()))
+            self._pending_rows += n
+            self._max_depth = max(self._max_depth, self._pending_rows)
+            self._cond.notify()
+        return future
+
+    def predict(self, X, timeout=None):
+        """Blocking convenience wrapper around :meth:`submit`."""
+        return self.submit(X).result(timeout)
+
+    def stats(self):
+        """Queue-depth and batching metrics since the batcher was created."""
+        with self._cond:
+            return {
+                "name": self.name,
+                "queue_depth": self._pending_rows,
+                "max_queue_depth": self._max_depth,
+                "batches": self._batches,
+                "rows": self._rows,
+                "mean_batch_rows": self._rows / self._batches if self._batches else 0.0,
+                "mean_wait_ms": 1000.0 * self._wait_total / self._rows if self._rows else 0.0,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _collect(self):
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return None
+
+            deadline = self._pending[0][3] + self.max_wait
+            while self._pending_rows < self.max_rows and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            items, rows = [], 0
+            while self._pending and (not items or rows + self._pending[0][1] <= self.max_rows):
+                item = self._pending.popleft()
+                items.append(item)
+                rows += item[1]
+            self._pending_rows -= rows
+            return items
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            if items is None:
+                return
+            if self.executor is not None:
+                self.executor.submit(self._execute, items)
+            else:
+                self._execute(items)
+
+    def _execute(self, items):
+        started = time.perf_counter()
+        inputs = [item[0] for item in items]
+        try:
+            # Not imported here (slow); a DataFrame implies pandas is already loaded
+            pd = sys.modules.get("pandas")
+            if pd is not None and isinstance(inputs[0], pd.DataFrame):
+                X = pd.concat(inputs, ignore_index=True) if len(inputs) > 1 else inputs[0]
+            else:
+                X = np.concatenate(inputs) if len(inputs) > 1 else inputs[0]
+            results = self.predict_fn(X)
+        except Exception as e:
+            for _, _, future, _ in items:
+                future.set_exception(e)
+            return
+
+        start = 0
+        wait = 0.0
+        for _, n, future, queued in items:
+            future.set_result(results[start:start + n])
+            start += n
+            wait += (started - queued) * n
+
+        with self._cond:
+            self._batches += 1
+            self._rows += start
+            self._wait_total += wait
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(key, predict_fn, **options):
+    """Return the process-wide batcher for ``key``, creating it on first use.
+
+    If ``predict_fn`` changes (e.g. the model was reloaded) the existing
+    batcher switches to the new function.
+    """
+    with _batchers_lock:
+        batcher = _batchers.get(key)
+        if batcher is None:
+            batcher = _batchers[key] = MicroBatcher(predict_fn, name=str(key), **options)
+        elif batcher.predict_fn != predict_fn:
+            batcher.predict_fn = predict_fn
+        return batcher
+
+
+def batcher_stats():
+    """Stats for every shared batcher, keyed by name."""
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+    return {b.name: b.stats() for b in batchers}
+
+
+metrics.register_stats("batcher", batcher_stats)
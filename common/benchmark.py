@@ -0,0 +1,298 @@
+# =========================================
+# Cross-App Inference Benchmark
+# =========================================
+"""Measure every app's prediction path headlessly, with the shipped artifacts.
+
+Each app runs in a fresh worker process through its adapter in
+:mod:`common.adapters` (the same code the HTTP server uses), so nothing is
+warm from an earlier app.  A worker reports:
+
+* ``cold_start`` – seconds to import the adapter module, load the
+  artifacts, and answer the first request;
+* ``latency_ms`` – p50 / p95 / p99 / mean of single-row requests
+  (``prepare`` + ``predict``, as a request would run them);
+* ``throughput`` – rows per second for each batch size;
+* ``rss_mb`` – resident memory after loading and the process peak.
+
+Inputs are synthetic rows in each app's input ranges (finalpro samples
+real rows from ``aa.csv``).  Results go to a JSON file that can be compared
+between runs::
+
+    python -m common.benchmark --output before.json
+    python -m common.benchmark team_a dbscan --sizes 1 64 4096 --runs 3 --output after.json
+    python -m common.benchmark --compare before.json after.json
+
+Feature toggles (``TEAM_A_PACKED_FOREST``, ``DBSCAN_GRID_INDEX``, ...) are
+read from the environment as usual and recorded in the output.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+APPS = ["featuresel", "dbscan", "finalpro", "team_a", "kmeans"]
+DEFAULT_SIZES = [1, 16, 256, 4096]
+DEFAULT_REQUESTS = 1000
+TOGGLE_PREFIXES = ("FEATURESEL_", "DBSCAN_", "TEAM_A_", "KMEANS_", "PREDICT_")
+
+
+# ---------------- synthetic inputs ----------------
+
+def _featuresel_rows(rng, n, features):
+    return [{"Pclass": int(rng.integers(1, 4)), "Sex": str(rng.choice(["Male", "Female"])),
+             "Age": float(rng.integers(1, 81)),
+             "Siblings/Spouses Aboard": int(rng.integers(0, 9)),
+             "Parents/Children Aboard": int(rng.integers(0, 7)),
+             "Fare": float(rng.uniform(0, 600))} for _ in range(n)]
+
+
+def _dbscan_rows(rng, n, features):
+    return [dict(zip(features, point)) for point in rng.uniform(-2.5, 2.5, (n, 2)).tolist()]
+
+
+def _finalpro_rows(rng, n, features):
+    import pandas as pd
+
+    df = pd.read_csv(os.path.join(ROOT_DIR, "finalpro", "aa.csv"), usecols=features)
+    return df.iloc[rng.integers(0, len(df), n)].to_dict("records")
+
+
+def _team_a_rows(rng, n, features):
+    return [{"Age": int(rng.integers(20, 61)), "Experience_Years": int(rng.integers(0, 21)),
+             "Department": str(rng.choice(["IT", "HR", "Sales", "Finance"])),
+             "Salary": int(rng.integers(30000, 100001)), "Work_Hours": int(rng.integers(30, 61)),
+             "Projects_Handled": int(rng.integers(1, 11)),
+             "Training_Hours": int(rng.integers(5, 51))} for _ in range(n)]
+
+
+def _kmeans_rows(rng, n, features):
+    return [dict(zip(features, row))
+            for row in np.column_stack([rng.uniform(0, 140, n), rng.uniform(0, 100, n)]).tolist()]
+
+
+SAMPLERS = {
+    "featuresel": _featuresel_rows,
+    "dbscan": _dbscan_rows,
+    "finalpro": _finalpro_rows,
+    "team_a": _team_a_rows,
+    "kmeans": _kmeans_rows,
+}
+
+
+# ---------------- worker (one app per process) ----------------
+
+def _memory_mb():
+    """``(current, peak)`` resident set size in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            fields = dict(line.split(":", 1) for line in f)
+        return int(fields["VmRSS"].split()[0]) / 1024, int(fields["VmHWM"].split()[0]) / 1024
+    except (OSError, KeyError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak /= 1024 * 1024 if sys.platform == "darwin" else 1024
+        return peak, peak
+
+
+def _percentiles(samples_s):
+    ms = np.asarray(samples_s) * 1e3
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"p50": p50, "p95": p95, "p99": p99, "mean": ms.mean(), "max": ms.max()}
+
+
+def run_app(app, sizes=DEFAULT_SIZES, requests=DEFAULT_REQUESTS, min_time=0.5, seed=0):
+    """Benchmark one app in this process and return its result dict."""
+    start = time.perf_counter()
+    from common.adapters import ADAPTERS
+
+    imported = time.perf_counter()
+    adapter = ADAPTERS[app]()
+    loaded = time.perf_counter()
+
+    rng = np.random.default_rng(seed)
+    features = list(adapter.features)
+    sample = SAMPLERS[app]
+    rows = sample(rng, max(requests, 1), features)
+    adapter.predict(adapter.prepare(rows[:1]))
+    first = time.perf_counter()
+    rss_loaded, _ = _memory_mb()
+
+    # Warm up, then time one request per row
+    for row in rows[:min(50, len(rows))]:
+        adapter.predict(adapter.prepare([row]))
+    samples = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        t = time.perf_counter()
+        adapter.predict(adapter.prepare([row]))
+        samples[i] = time.perf_counter() - t
+
+    throughput = {}
+    for size in sizes:
+        batch = sample(rng, size, features)
+        adapter.predict(adapter.prepare(batch))
+        calls, t = 0, time.perf_counter()
+        while True:
+            adapter.predict(adapter.prepare(batch))
+            calls += 1
+            elapsed = time.perf_counter() - t
+            if elapsed >= min_time and calls >= 3:
+                break
+        throughput[str(size)] = {"rows_per_s": size * calls / elapsed,
+                                 "ms_per_batch": elapsed / calls * 1e3}
+
+    _, rss_peak = _memory_mb()
+    return {
+        "cold_start": {"import_s": imported - start, "load_s": loaded - imported,
+                       "first_predict_s": first - loaded, "total_s": first - start},
+        "latency_ms": _percentiles(samples),
+        "requests": len(rows),
+        "throughput": throughput,
+        "rss_mb": {"after_load": rss_loaded, "peak": rss_peak},
+    }
+
+
+# ---------------- driver ----------------
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _run_worker(app, sizes, requests, min_time, seed):
+    cmd = [sys.executable, "-m", "common.benchmark", "--worker", app,
+           "--sizes", *map(str, sizes), "--requests", str(requests),
+           "--min-time", str(min_time), "--seed", str(seed)]
+    proc = subprocess.run(cmd, cwd=ROOT_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1:] or ["failed"]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(apps=APPS, sizes=DEFAULT_SIZES, requests=DEFAULT_REQUESTS, min_time=0.5, seed=0,
+        runs=1):
+    """Benchmark each app in fresh processes; returns the report dict.
+
+    With ``runs > 1`` each app is run that many times and the run with the
+    median p50 latency is kept, which damps noise from other load.
+    """
+    results = {}
+    for app in apps:
+        attempts = [_run_worker(app, sizes, requests, min_time, seed) for _ in range(runs)]
+        ok = sorted((r for r in attempts if "error" not in r),
+                    key=lambda r: r["latency_ms"]["p50"])
+        results[app] = ok[(len(ok) - 1) // 2] if ok else attempts[0]
+
+    return {
+        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {"sizes": list(sizes), "requests": requests, "min_time": min_time,
+                   "seed": seed, "runs": runs,
+                   "env": {k: v for k, v in os.environ.items() if k.startswith(TOGGLE_PREFIXES)}},
+        "results": results,
+    }
+
+
+def summary_rows(report):
+    """Flat ``(app, metric, value)`` rows; lower is better except throughput."""
+    for app, result in report["results"].items():
+        if "error" in result:
+            continue
+        yield app, "cold_start_s", result["cold_start"]["total_s"]
+        for q in ("p50", "p95", "p99"):
+            yield app, f"latency_{q}_ms", result["latency_ms"][q]
+        for size, t in result["throughput"].items():
+            yield app, f"rows_per_s@{size}", t["rows_per_s"]
+        yield app, "peak_rss_mb", result["rss_mb"]["peak"]
+
+
+def print_report(report):
+    for app, result in report["results"].items():
+        if "error" in result:
+            print(f"{app:<11} ERROR {result['error'][0]}")
+            continue
+        lat = result["latency_ms"]
+        thr = "  ".join(f"{size}:{t['rows_per_s']:,.0f}/s" for size, t in result["throughput"].items())
+        print(f"{app:<11} cold {result['cold_start']['total_s']:6.2f}s  "
+              f"p50 {lat['p50']:7.3f}ms  p95 {lat['p95']:7.3f}ms  p99 {lat['p99']:7.3f}ms  "
+              f"peak {result['rss_mb']['peak']:6.1f}MB  {thr}")
+
+
+def compare(before, after):
+    """Print every metric side by side with the relative change."""
+    old = {(app, metric): value for app, metric, value in summary_rows(before)}
+    print(f"{'app':<11} {'metric':<22} {'before':>12} {'after':>12} {'change':>8}")
+    for app, metric, value in summary_rows(after):
+        base = old.get((app, metric))
+        if base is None:
+            continue
+        change = (value - base) / base * 100 if base else 0.0
+        better = change > 0 if metric.startswith("rows_per_s") else change < 0
+        flag = "+" if better and abs(change) >= 5 else "-" if abs(change) >= 5 else " "
+        print(f"{app:<11} {metric:<22} {base:>12.4g} {value:>12.4g} {change:>+7.1f}% {flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the five apps' inference paths.")
+    parser.add_argument("apps", nargs="*", help=f"any of {', '.join(APPS)} (default: all)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="batch sizes for throughput (default: %(default)s)")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS,
+                        help="single-row requests timed per app (default: %(default)s)")
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="seconds spent on each batch size (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=1,
+                        help="fresh processes per app; the median run is kept (default: %(default)s)")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="compare two saved reports instead of running")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        result = run_app(args.worker, args.sizes, args.requests, args.min_time, args.seed)
+        print(json.dumps(result))
+        return
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path, encoding="utf-8") as f:
+                reports.append(json.load(f))
+        compare(*reports)
+        return
+
+    unknown = [app for app in args.apps if app not in APPS]
+    if unknown:
+        parser.error(f"unknown apps: {', '.join(unknown)}")
+
+    report = run(args.apps or APPS, args.sizes, args.requests, args.min_time, args.seed,
+                 args.runs)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# =========================================
+# Convert Loose Pickles to Artifact Bundles
+# =========================================
+"""Write each app's ``bundle/`` from the pickles it ships today.
+
+The apps load ``bundle/`` whenever it exists, so every training script
+publishes it as well as its pickles (``dbscan/train_dbscan.py``
+directly, ``K_Meanselbow/k_meanselbow.py`` and
+``featuresel/train_selection.py`` through the builders below).  finalpro
+keeps no pickles at all: ``finalpro/aaa.py`` writes only its bundle.  This
+rebuilds the others from the existing files without retraining::
+
+    python -m common.build_bundles              # every app
+    python -m common.build_bundles team_a kmeans
+"""
+
+import argparse
+import os
+
+import joblib
+
+from common.adapters import PROJECT_DIRS
+from common.bundle import Bundle, bundle_path, write_bundle
+
+
+def build_featuresel(base_dir):
+    from model_pool import MODEL_FILES, ORIGINAL_FEATURES
+
+    members = {name: joblib.load(os.path.join(base_dir, filename))
+               for name, filename in MODEL_FILES.items()}
+    return write_bundle(bundle_path(base_dir), members, features=ORIGINAL_FEATURES)
+
+
+def build_dbscan(base_dir):
+    from assign import CoreSamples
+    from grid_index import bundle_members
+
+    dbscan = joblib.load(os.path.join(base_dir, "dbscan.pkl"))
+    members, metadata = bundle_members(CoreSamples.from_estimator(dbscan))
+    return write_bundle(bundle_path(base_dir), members, features=["f1", "f2"],
+                        metadata={**metadata, "min_samples": dbscan.min_samples})
+
+
+def build_team_a(base_dir):
+    from fast_predict import bundle_members
+
+    members, features = bundle_members(
+        joblib.load(os.path.join(base_dir, "random_forest_model.pkl")),
+        joblib.load(os.path.join(base_dir, "label_encoder.pkl")))
+    return write_bundle(bundle_path(base_dir), members, features=features)
+
+
+def build_kmeans(base_dir):
+    members = {"kmeans": joblib.load(os.path.join(base_dir, "cluster_model.pkl")),
+               "scaler": joblib.load(os.path.join(base_dir, "scalar.pkl"))}
+    return write_bundle(bundle_path(base_dir), members,
+                        features=["Annual Income (k$)", "Spending Score (1-100)"])
+
+
+BUILDERS = {
+    "featuresel": build_featuresel,
+    "dbscan": build_dbscan,
+    "team_a": build_team_a,
+    "kmeans": build_kmeans,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build artifact bundles from the loose pickles.")
+    parser.add_argument("apps", nargs="*", help=f"any of {', '.join(BUILDERS)} (default: all)")
+    args = parser.parse_args(argv)
+    unknown = [app for app in args.apps if app not in BUILDERS]
+    if unknown:
+        parser.error(f"unknown apps: {', '.join(unknown)}")
+
+    for app in args.apps or BUILDERS:
+        base_dir = PROJECT_DIRS[app]
+        BUILDERS[app](base_dir)
+        bundle = Bundle(bundle_path(base_dir))
+        size = sum(entry["bytes"] for entry in bundle.members.values())
+        print(f"{app:<11} {len(bundle)} members, {size:>9,d} B, checksum {bundle.checksum[:12]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# =========================================
+# Versioned Artifact Bundles
+# =========================================
+"""One directory per model instead of a handful of loose pickles.
+
+A bundle looks like::
+
+    bundle/
+        manifest.json
+        core_points-3f9a1c2e7b4d.npy        # array member
+        model-a41c09e2d5f7.joblib           # object member
+
+``manifest.json`` records the format version, the model version, the
+feature schema (input columns, in order), free-form ``metadata`` and, for
+every member, its file, kind and SHA-256.  ``checksum`` is one digest over
+all member digests, which identifies the bundle as a whole.
+
+Members are stored uncompressed so they can be memory-mapped.  NumPy arrays
+are plain ``.npy`` files opened with ``np.load(mmap_mode="r")``.  Other
+objects (fitted estimators, encoders) are uncompressed joblib pickles, whose
+embedded arrays joblib maps copy-on-write (``"c"``), because some
+estimators (libsvm's SVC) insist on writable buffers they never write to.
+Every worker process that opens the bundle then shares one copy of the
+support vectors, tree arrays or core samples through the page cache,
+instead of unpickling its own.
+
+Member file names contain their digest and ``manifest.json`` is replaced
+atomically.  A publish keeps the previous version's member files and only
+removes those from versions before it.  A process that opened the old
+manifest can therefore still load its (lazily read) members until the next
+publish after that.  :func:`load_bundle` goes through the shared registry,
+so a running app picks up a republished bundle on its next rerun.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+
+from common import metrics
+from common.registry import ROOT_DIR, artifact_digest, file_digest, load_artifact
+
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_DIR = "bundle"
+MANIFEST_FILE = "manifest.json"
+
+
+def _slug(name):
+    return re.sub(r"[^a-z0-9_.]+", "_", name.lower()).strip("_") or "member"
+
+
+def _checksum(members):
+    h = hashlib.sha256()
+    for name in sorted(members):
+        h.update(f"{name}:{members[name]['sha256']}\n".encode())
+    return h.hexdigest()
+
+
+def write_bundle(path, members, features=None, model_version=None, metadata=None):
+    """Write ``members`` (name -> array or object) as a bundle at ``path``.
+
+    Returns the manifest.  Once the new manifest is in place, files from
+    versions older than the one it replaces are removed.
+    """
+    os.makedirs(path, exist_ok=True)
+    previous = set()
+    if has_bundle(path):
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            previous = {entry["file"] for entry in json.load(f)["members"].values()}
+    entries = {}
+    for name, value in members.items():
+        tmp = os.path.join(path, f".{_slug(name)}.tmp-{os.getpid()}")
+        if isinstance(value, np.ndarray):
+            kind, ext = "array", ".npy"
+            with open(tmp, "wb") as f:
+                np.save(f, value, allow_pickle=False)
+        else:
+            kind, ext = "object", ".joblib"
+            joblib.dump(value, tmp)
+
+        digest = file_digest(tmp)
+        filename = f"{_slug(name)}-{digest[:12]}{ext}"
+        entry = {"file": filename, "kind": kind, "sha256": digest,
+                 "bytes": os.path.getsize(tmp)}
+        if kind == "array":
+            entry.update(dtype=value.dtype.str, shape=list(value.shape))
+        os.replace(tmp, os.path.join(path, filename))
+        entries[name] = entry
+
+    manifest = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "model_version": model_version,
+        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "features": list(features) if features is not None else None,
+        "metadata": dict(metadata or {}),
+        "members": entries,
+        "checksum": _checksum(entries),
+    }
+    tmp = os.path.join(path, f".{MANIFEST_FILE}.tmp-{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, os.path.join(path, MANIFEST_FILE))
+
+    keep = {entry["file"] for entry in entries.values()} | previous | {MANIFEST_FILE}
+    for filename in os.listdir(path):
+        if filename not in keep and not filename.startswith("."):
+            os.remove(os.path.join(path, filename))
+    return manifest
+
+
+class Bundle:
+    """Read side of a bundle; members are loaded on first access.
+
+    ``verify=True`` re-hashes each member file as it is loaded.  That reads
+    it in full, defeating the memory map, so it is left to the ``bundle``
+    CLI; :func:`write_bundle` hashes the files it writes.
+    """
+
+    def __init__(self, path, mmap_mode="r", object_mmap_mode="c", verify=False):
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        version = manifest.get("format_version")
+        if version != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported bundle format version: {version!r}")
+        if manifest.get("checksum") != _checksum(manifest["members"]):
+            raise ValueError(f"Bundle manifest checksum mismatch in {path}")
+
+        self.path = path
+        self.manifest = manifest
+        self.features = manifest.get("features")
+        self.model_version = manifest.get("model_version")
+        self.metadata = manifest.get("metadata", {})
+        self.members = manifest["members"]
+        self.checksum = manifest["checksum"]
+        self.mmap_mode = mmap_mode
+        self.object_mmap_mode = object_mmap_mode
+        self.verify = verify
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.members
+
+    def __len__(self):
+        return len(self.members)
+
+    def keys(self):
+        return list(self.members)
+
+    def __getitem__(self, name):
+        return self.load(name)
+
+    def load(self, name, cache=True):
+        """Member ``name``, loaded on first access.
+
+        With ``cache=False`` the member is read afresh and not kept by the
+        bundle, so it is freed once the caller drops it (for callers that
+        manage residency themselves).
+        """
+        if name not in self.members:
+            raise KeyError(f"Bundle {self.path} has no member {name!r}")
+        if not cache:
+            return self._load(name)
+        with self._lock:
+            if name not in self._values:
+                self._values[name] = self._load(name)
+            return self._values[name]
+
+    def get(self, name, default=None):
+        return self[name] if name in self.members else default
+
+    def group(self, prefix):
+        """``{suffix: value}`` for every member named ``prefix.suffix``."""
+        start = f"{prefix}."
+        return {name[len(start):]: self[name] for name in self.members if name.startswith(start)}
+
+    def _load(self, name):
+        entry = self.members[name]
+        path = os.path.join(self.path, entry["file"])
+        with metrics.stage(os.path.relpath(path, ROOT_DIR), "load"):
+            if self.verify and file_digest(path) != entry["sha256"]:
+                raise ValueError(f"Checksum mismatch for bundle member {name!r} ({path})")
+            if entry["kind"] == "array":
+                # np.memmap cannot be 0-d, so scalars are simply read
+                mmap_mode = self.mmap_mode if entry["shape"] else None
+                return np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+            return joblib.load(path, mmap_mode=self.object_mmap_mode)
+
+
+def bundle_path(base_dir):
+    return os.path.join(base_dir, BUNDLE_DIR)
+
+
+def has_bundle(path):
+    return os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+
+def _open(manifest_path):
+    return Bundle(os.path.dirname(manifest_path))
+
+
+def load_bundle(path, derive=None):
+    """Return the shared, memory-mapped :class:`Bundle` at ``path``.
+
+    As with :func:`common.registry.load_artifact`, ``derive`` builds a value
+    from the bundle once per version and is cached in its place.
+    """
+    return load_artifact(os.path.join(path, MANIFEST_FILE), derive=derive, loader=_open)
+
+
+def bundle_digest(path):
+    """SHA-256 of the manifest currently loaded for the bundle at ``path``."""
+    return artifact_digest(os.path.join(path, MANIFEST_FILE), loader=_open)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show and verify an artifact bundle.")
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    bundle = Bundle(args.path, verify=True)
+    print(f"{args.path}: version {bundle.model_version}, checksum {bundle.checksum[:12]}")
+    print("features:", bundle.features)
+    for name, entry in bundle.members.items():
+        bundle[name]
+        shape = f" {entry['dtype']}{tuple(entry['shape'])}" if entry["kind"] == "array" else ""
+        print(f"  {name:<28} {entry['kind']:<6} {entry['bytes']:>10,d} B{shape}  ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# =========================================
+# Compiled Categorical Encoders
+# =========================================
+"""Category → code lookup tables built once, applied with one ``take``.
+
+A :class:`CategoryTable` is compiled from a fitted ``LabelEncoder``, a list
+of categories or a plain ``{category: code}`` dict.  Whole columns are
+encoded by hashing them against the category index and gathering the codes
+in a single NumPy ``take``.  Unknown categories are rejected with a
+``ValueError`` before anything is encoded.  A :class:`CategoryEncoder`
+groups the tables of several columns; finalpro builds one from its training
+manifest (``finalpro/encoding_manifest.py``).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class CategoryTable:
+    """Lookup table for one categorical column."""
+
+    def __init__(self, categories, codes=None, name=None):
+        self.name = name
+        self.categories = pd.Index(list(categories))
+        if not self.categories.is_unique:
+            raise ValueError(f"Duplicate categories for column {name!r}")
+        if codes is None:
+            codes = np.arange(len(self.categories))
+        self.codes = np.asarray(codes, dtype=np.int64)
+        if len(self.codes) != len(self.categories):
+            raise ValueError(f"Column {name!r} has {len(self.categories)} categories "
+                             f"but {len(self.codes)} codes")
+        self._lookup = dict(zip(self.categories, self.codes.tolist()))
+
+    @classmethod
+    def from_label_encoder(cls, encoder, name=None):
+        return cls(encoder.classes_, name=name)
+
+    @classmethod
+    def from_mapping(cls, mapping, name=None):
+        return cls(list(mapping), list(mapping.values()), name=name)
+
+    def __len__(self):
+        return len(self.categories)
+
+    def __contains__(self, value):
+        return value in self._lookup
+
+    def code(self, value):
+        """Code of a single category."""
+        try:
+            return self._lookup[value]
+        except (KeyError, TypeError):
+            raise ValueError(f"Unknown category for column {self.name!r}: {value!r}") from None
+
+    __call__ = code
+
+    def encode(self, values):
+        """Codes for a whole column (list, array or Series) as an int64 array."""
+        values = np.asarray(values, dtype=object)
+        positions = self.categories.get_indexer(values)
+        if (positions < 0).any():
+            unknown = sorted(set(map(str, values[positions < 0])))
+            raise ValueError(f"Unknown categories in column {self.name!r}: {unknown}")
+        return self.codes.take(positions)
+
+    def to_dict(self):
+        return dict(self._lookup)
+
+
+class CategoryEncoder:
+    """The lookup tables for every categorical column of a model's input."""
+
+    def __init__(self, tables):
+        self.tables = dict(tables)
+
+    @classmethod
+    def from_mappings(cls, mappings):
+        """``{column: {category: code}}``."""
+        return cls({col: CategoryTable.from_mapping(m, name=col) for col, m in mappings.items()})
+
+    @property
+    def columns(self):
+        return list(self.tables)
+
+    def __contains__(self, column):
+        return column in self.tables
+
+    def __getitem__(self, column):
+        return self.tables[column]
+
+    def encode_frame(self, df, columns=None):
+        """Copy of ``df[columns]`` with every categorical column encoded.
+
+        All columns are checked before any is replaced, so a bad value in
+        the last column fails as fast as one in the first.
+        """
+        columns = list(df.columns) if columns is None else list(columns)
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Input is missing required columns: {missing}")
+
+        encoded = {col: self.tables[col].encode(df[col].to_numpy())
+                   for col in columns if col in self.tables}
+        X = df[columns].copy()
+        for col, codes in encoded.items():
+            X[col] = codes
+        return X
+
@@ -0,0 +1,317 @@
+# =========================================
+# Per-Stage Timing Instrumentation
+# =========================================
+"""Where does a prediction spend its time?
+
+The apps, the batch scorer and the HTTP server wrap each pipeline stage::
+
+    with stage("finalpro", "scale"):
+        X = scaler.transform(X)
+
+Stages used across the repo are ``load`` (artifact deserialization,
+recorded by :mod:`common.registry` per artifact), ``encode``, ``scale``,
+``predict`` and ``request`` (a whole request or batch, end to end).
+
+Timing is off unless ``PREDICT_METRICS=1`` (or :func:`enable` is called).
+Disabled, :func:`stage` hands back one shared no-op context manager, so an
+instrumented call costs a function call and nothing else.  Enabled, each
+(model, stage) pair keeps
+
+* a cumulative histogram over fixed buckets, for Prometheus; and
+* a rolling window of the last ``PREDICT_METRICS_WINDOW`` (1024) samples,
+  for p50 / p95 / p99 of recent traffic.
+
+:func:`render_prometheus` is served by ``common.server`` at ``/metrics``.
+:func:`summary_line` condenses everything into one log line.  With
+``PREDICT_METRICS_LOG_S=60`` that line is printed every minute by a
+background thread, which is how the Streamlit apps report.
+
+Components that keep their own counters register them with
+:func:`register_stats`.  The shared micro-batchers (batch sizes, queue
+waits) and prediction caches (hit rates) do, and their stats are exported with the timers as
+``predict_<component>_<stat>`` gauges and appended to the summary line.
+
+Profiling is separate and opt-in: with ``PREDICT_PROFILE_DIR`` set,
+:func:`profile` runs cProfile around each wrapped call and keeps the
+profile of any call slower than ``PREDICT_PROFILE_SLOW_MS`` (default 100)
+as ``<dir>/<model>-<timestamp>-<pid>.<n>-<ms>ms.prof`` (at most
+``PREDICT_PROFILE_MAX_FILES`` per process), for ``python -m pstats``.
+"""
+
+import bisect
+import contextlib
+import cProfile
+import os
+import threading
+import time
+
+import numpy as np
+
+BUCKETS_S = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+             0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_WINDOW = int(os.environ.get("PREDICT_METRICS_WINDOW", "1024"))
+LOG_INTERVAL_S = float(os.environ.get("PREDICT_METRICS_LOG_S", "0"))
+PROFILE_DIR = os.environ.get("PREDICT_PROFILE_DIR") or None
+PROFILE_SLOW_MS = float(os.environ.get("PREDICT_PROFILE_SLOW_MS", "100"))
+PROFILE_MAX_FILES = int(os.environ.get("PREDICT_PROFILE_MAX_FILES", "100"))
+
+_enabled = os.environ.get("PREDICT_METRICS", "0") == "1"
+_NOOP = contextlib.nullcontext()
+
+
+class StageTimer:
+    """Histogram plus rolling window of durations for one (model, stage)."""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.buckets = [0] * (len(BUCKETS_S) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._recent = np.zeros(window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect.bisect_left(BUCKETS_S, seconds)
+        with self._lock:
+            self.buckets[i] += 1
+            self._recent[self.count % len(self._recent)] = seconds
+            self.count += 1
+            self.total += seconds
+
+    def snapshot(self):
+        with self._lock:
+            count, total, buckets = self.count, self.total, list(self.buckets)
+            recent = self._recent[:min(count, len(self._recent))].copy()
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99]) if len(recent) else (0.0, 0.0, 0.0)
+        return {"count": count, "sum_s": total, "buckets": buckets,
+                "p50_s": float(p50), "p95_s": float(p95), "p99_s": float(p99)}
+
+
+class _Stage:
+    __slots__ = ("timer", "start")
+
+    def __init__(self, timer):
+        self.timer = timer
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.observe(time.perf_counter() - self.start)
+        return False
+
+
+_timers = {}
+_timers_lock = threading.Lock()
+_reporter = None
+_stats_sources = {}
+
+
+def enable(flag=True):
+    """Turn timing on or off for the whole process."""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def enabled():
+    return _enabled
+
+
+def timer(model, name):
+    """The shared :class:`StageTimer` for ``(model, name)``."""
+    key = (model, name)
+    t = _timers.get(key)
+    if t is None:
+        with _timers_lock:
+            t = _timers.get(key)
+            if t is None:
+                t = _timers[key] = StageTimer()
+        if LOG_INTERVAL_S > 0:
+            start_reporter(LOG_INTERVAL_S)
+    return t
+
+
+def stage(model, name):
+    """Context manager timing one pipeline stage (a no-op when disabled)."""
+    if not _enabled:
+        return _NOOP
+    return _Stage(timer(model, name))
+
+
+def record(model, name, seconds):
+    """Add a duration measured elsewhere."""
+    if _enabled:
+        timer(model, name).observe(seconds)
+
+
+def snapshot():
+    """``{(model, stage): stats}`` for every timer seen so far."""
+    with _timers_lock:
+        items = list(_timers.items())
+    return {key: t.snapshot() for key, t in sorted(items)}
+
+
+def reset():
+    with _timers_lock:
+        _timers.clear()
+
+
+def register_stats(component, collect):
+    """Export ``collect()`` (``{name: {stat: value}}``) with the timers.
+
+    Numeric values become gauges; anything else is left out.  These
+    counters are kept whether or not timing is enabled, so the
+    ``PREDICT_METRICS_LOG_S`` reporter starts here as well.
+    """
+    with _timers_lock:
+        _stats_sources[component] = collect
+    if LOG_INTERVAL_S > 0:
+        start_reporter(LOG_INTERVAL_S)
+
+
+def component_stats():
+    """``{component: {name: {stat: number}}}`` from every registered source."""
+    with _timers_lock:
+        sources = sorted(_stats_sources.items())
+    return {component: {name: {k: v for k, v in stats.items()
+                               if isinstance(v, (int, float)) and not isinstance(v, bool)}
+                        for name, stats in collect().items()}
+            for component, collect in sources}
+
+
+# ---------------- export ----------------
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _labels(model, name):
+    return f'model="{_escape(model)}",stage="{name}"'
+
+
+def render_prometheus():
+    """Prometheus text exposition of every timer."""
+    lines = ["# HELP predict_stage_seconds Time spent in each prediction pipeline stage.",
+             "# TYPE predict_stage_seconds histogram"]
+    stats = snapshot()
+    for (model, name), s in stats.items():
+        labels = _labels(model, name)
+        cumulative = 0
+        for bound, n in zip(BUCKETS_S, s["buckets"]):
+            cumulative += n
+            lines.append(f'predict_stage_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        lines.append(f'predict_stage_seconds_bucket{{{labels},le="+Inf"}} {s["count"]}')
+        lines.append(f"predict_stage_seconds_sum{{{labels}}} {s['sum_s']:.9f}")
+        lines.append(f"predict_stage_seconds_count{{{labels}}} {s['count']}")
+
+    lines += ["# HELP predict_stage_recent_seconds Quantiles over the most recent samples.",
+              "# TYPE predict_stage_recent_seconds summary"]
+    for (model, name), s in stats.items():
+        labels = _labels(model, name)
+        for q, key in (("0.5", "p50_s"), ("0.95", "p95_s"), ("0.99", "p99_s")):
+            lines.append(f'predict_stage_recent_seconds{{{labels},quantile="{q}"}} {s[key]:.9f}')
+
+    for component, named in component_stats().items():
+        gauges = {}
+        for name, counters in named.items():
+            for stat, value in counters.items():
+                gauges.setdefault(stat, []).append((name, value))
+        for stat, values in sorted(gauges.items()):
+            metric = f"predict_{component}_{stat}"
+            lines += [f"# HELP {metric} {stat} of each {component}.", f"# TYPE {metric} gauge"]
+            lines += [f'{metric}{{name="{_escape(name)}"}} {value:g}' for name, value in values]
+    return "\n".join(lines) + "\n"
+
+
+def summary_line():
+    """One line: ``model/stage n=.. p50=..ms p95=..ms p99=..ms`` for every timer."""
+    parts = [f"{model}/{name} n={s['count']} p50={s['p50_s'] * 1e3:.3f}ms "
+             f"p95={s['p95_s'] * 1e3:.3f}ms p99={s['p99_s'] * 1e3:.3f}ms"
+             for (model, name), s in snapshot().items()]
+    parts += [f"{component} {name} " + " ".join(f"{k}={v:.4g}" for k, v in stats.items())
+              for component, named in component_stats().items() for name, stats in named.items()]
+    return "metrics " + (" | ".join(parts) if parts else "(no samples)")
+
+
+def start_reporter(interval_s, emit=None):
+    """Print :func:`summary_line` every ``interval_s`` seconds (once per process)."""
+    global _reporter
+    with _timers_lock:
+        if _reporter is not None:
+            return _reporter
+        emit = emit or (lambda line: print(line, flush=True))
+
+        def run():
+            while True:
+                time.sleep(interval_s)
+                emit(summary_line())
+
+        _reporter = threading.Thread(target=run, name="metrics-reporter", daemon=True)
+        _reporter.start()
+        return _reporter
+
+
+# ---------------- slow-call profiling ----------------
+
+_profiling = threading.local()
+_profile_files = 0
+_profile_lock = threading.Lock()
+
+
+class _Profiled:
+    __slots__ = ("model", "name", "profiler", "start")
+
+    def __init__(self, model, name):
+        self.model = model
+        self.name = name
+        self.profiler = None
+
+    def __enter__(self):
+        # Nested calls and a second active profiler are timed but not profiled
+        if not getattr(_profiling, "active", False):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                profiler = None
+            else:
+                _profiling.active = True
+            self.profiler = profiler
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        record(self.model, self.name, elapsed)
+        if self.profiler is None:
+            return False
+        self.profiler.disable()
+        _profiling.active = False
+        if elapsed * 1e3 >= PROFILE_SLOW_MS:
+            _save_profile(self.profiler, self.model, elapsed)
+        return False
+
+
+def _save_profile(profiler, model, elapsed):
+    global _profile_files
+    with _profile_lock:
+        if _profile_files >= PROFILE_MAX_FILES:
+            return
+        _profile_files += 1
+        seq = _profile_files
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(model))
+    path = os.path.join(PROFILE_DIR,
+                        f"{safe}-{stamp}-{os.getpid()}.{seq}-{elapsed * 1e3:.0f}ms.prof")
+    profiler.dump_stats(path)
+
+
+def profile(model, name="request"):
+    """Time a whole request as stage ``name`` and keep its profile if slow.
+
+    Without ``PREDICT_PROFILE_DIR`` this is the same as :func:`stage`.
+    """
+    if PROFILE_DIR is None:
+        return stage(model, name)
+    return _Profiled(model, name)
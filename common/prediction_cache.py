@@ -0,0 +1,152 @@
+# =========================================
+# Shared Prediction Cache
+# =========================================
+"""Memoize prediction results across reruns and sessions.
+
+Streamlit reruns the whole script on every click, so pressing Predict twice
+with the same inputs (or two users asking about the same passenger) would
+repeat the full pipeline.  :class:`PredictionCache` keys each result on
+
+* the model key – usually the SHA-256 digests of every artifact involved,
+  from :func:`common.registry.artifact_digest` (or the manifest digest of an
+  artifact bundle), so a retrained model never serves stale results; and
+* a canonical form of the input – numeric inputs are compared as float64
+  bytes, so ``30`` and ``30.0`` hit the same entry.
+
+Entries are evicted least-recently-used beyond ``max_entries`` (default
+``PREDICT_CACHE_SIZE``, 4096).  Cached arrays are made read-only because
+every caller gets the same object back.  :func:`get_cache` returns one cache
+per name for the whole process, shared by every session.  Hit rates and
+sizes (:func:`cache_stats`) are reported through :mod:`common.metrics` as
+``predict_cache_*`` gauges and in its summary line.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from common import metrics
+from common.bundle import bundle_digest
+from common.registry import artifact_digest
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get("PREDICT_CACHE_SIZE", "4096"))
+
+
+def canonical_input(X):
+    """Hashable, dtype-insensitive key for an input row or matrix."""
+    columns = None
+    # Not imported here (slow); a DataFrame implies pandas is already loaded
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(X, pd.DataFrame):
+        columns = tuple(X.columns)
+        X = X.to_numpy()
+    arr = np.asarray(X)
+    if arr.dtype.kind in "biuf":
+        # + 0.0 folds -0.0 into 0.0
+        data = np.ascontiguousarray(arr, dtype=np.float64) + 0.0
+        return columns, arr.shape, data.tobytes()
+    return columns, arr.shape, tuple(arr.ravel().tolist())
+
+
+def model_key(name, *paths):
+    """``(name, digest, ...)`` for the artifacts a prediction depends on.
+
+    ``paths`` are artifact files or bundle directories.
+    """
+    return (name,) + tuple(bundle_digest(path) if os.path.isdir(path) else artifact_digest(path)
+                           for path in paths)
+
+
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _freeze(item)
+    elif isinstance(value, tuple):
+        for item in value:
+            _freeze(item)
+    return value
+
+
+class PredictionCache:
+    """Bounded LRU of prediction results."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, name=None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.name = name or "predictions"
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, X, compute):
+        """Return the cached result for ``(key, X)``, or ``compute(X)`` and store it.
+
+        ``compute`` runs outside the lock, so a slow model never blocks hits
+        for other inputs.
+        """
+        entry_key = (key, canonical_input(X))
+        with self._lock:
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                self._hits += 1
+                return self._entries[entry_key]
+            self._misses += 1
+
+        value = _freeze(compute(X))
+
+        with self._lock:
+            self._entries[entry_key] = value
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def stats(self):
+        """Hit-rate and size metrics since the cache was created."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name="predictions", **options):
+    """Return the process-wide cache called ``name``, creating it on first use."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = PredictionCache(name=name, **options)
+        return cache
+
+
+def cache_stats():
+    """Stats for every shared cache, keyed by name."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {c.name: c.stats() for c in caches}
+
+
+metrics.register_stats("cache", cache_stats)
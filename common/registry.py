@@ -0,0 +1,107 @@
+# =========================================
+# Shared Model Registry
+# =========================================
+"""Load each model artifact once per process and share it across sessions.
+
+Streamlit re-executes an app script on every widget change, but imported
+modules stay resident, so the cache below lives for the whole server process
+and is shared by every session.  A file is only deserialized again when its
+modification time or size changes *and* its SHA-256 digest differs from the
+one that was loaded; a plain ``touch`` keeps the cached object.
+
+Each (re)load is timed as the ``load`` stage of :mod:`common.metrics`,
+labelled with the artifact's path relative to the repository root.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+import joblib
+
+from common import metrics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CHUNK_SIZE = 1 << 20
+
+_entries = {}
+_entries_lock = threading.Lock()
+
+
+class _Entry:
+    __slots__ = ("lock", "stamp", "digest", "value")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.digest = None
+        self.value = None
+
+
+def file_digest(path):
+    """Return the hex SHA-256 digest of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _entry_for(path, derive):
+    key = (os.path.abspath(path), derive)
+    with _entries_lock:
+        entry = _entries.get(key)
+        if entry is None:
+            entry = _entries[key] = _Entry()
+        return key[0], entry
+
+
+def _refresh(path, derive, loader):
+    path, entry = _entry_for(path, derive)
+    stamp = _stamp(path)
+
+    if entry.stamp == stamp:
+        return entry
+
+    with entry.lock:
+        if entry.stamp == stamp:
+            return entry
+
+        digest = file_digest(path)
+        if digest != entry.digest:
+            start = time.perf_counter()
+            value = loader(path)
+            if derive is not None:
+                value = derive(value)
+            metrics.record(os.path.relpath(path, ROOT_DIR), "load", time.perf_counter() - start)
+            entry.value = value
+            entry.digest = digest
+        entry.stamp = stamp
+        return entry
+
+
+def load_artifact(path, derive=None, loader=joblib.load):
+    """Return the object stored at ``path``, loading it at most once.
+
+    ``derive`` is an optional callable applied to the freshly loaded object
+    (e.g. to build an index from a fitted estimator); the derived value is
+    cached in its place and rebuilt only when the file changes.
+    """
+    return _refresh(path, derive, loader).value
+
+
+def artifact_digest(path, derive=None, loader=joblib.load):
+    """Return the SHA-256 digest of the version of ``path`` currently loaded."""
+    return _refresh(path, derive, loader).digest
+
+
+def clear_registry():
+    """Drop every cached artifact (mainly useful for tests and benchmarks)."""
+    with _entries_lock:
+        _entries.clear()
@@ -0,0 +1,265 @@
+# =========================================
+# Headless HTTP Inference Service
+# =========================================
+"""Serve all five models over HTTP/JSON from one process.
+
+Usage::
+
+    python -m common.server --host 0.0.0.0 --port 8000
+
+Endpoints:
+
+* ``GET /health`` – liveness and loaded models;
+* ``GET /models`` – each model's input features (and featuresel methods);
+* ``GET /stats`` – micro-batching queue depth and batch-size metrics;
+* ``GET /metrics`` – per-stage timings in Prometheus text format (with
+  ``--metrics`` or ``PREDICT_METRICS=1``; see :mod:`common.metrics`);
+* ``POST /predict/<model>`` – body ``{"instances": [...]}`` or
+  ``{"instance": ...}``; featuresel also accepts ``"method"`` (a method
+  name or ``"all"``).  Responds with ``{"predictions": [...]}``.
+
+The server is a small asyncio HTTP/1.1 implementation (no extra
+dependencies).  Artifacts are loaded once at startup.  Requests for the same
+model that arrive within ``--batch-wait-ms`` of each other are stacked into
+one ``predict`` call (up to ``--max-batch`` rows) by
+:class:`common.batching.MicroBatcher`, which runs batches on a thread pool
+sized to the CPU count so the event loop never blocks on sklearn.
+
+With metrics on, each model records ``encode``/``scale``/``predict`` from
+its adapter, ``batch`` for every micro-batch and ``request`` end to end.
+Batches slower than ``PREDICT_PROFILE_SLOW_MS`` are cProfiled into
+``PREDICT_PROFILE_DIR`` when that is set.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from common import metrics
+from common.adapters import load_adapters
+from common.batching import MicroBatcher
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class InferenceServer:
+    def __init__(self, adapters, workers=None, max_batch=256, batch_wait_ms=2.0):
+        self.adapters = adapters
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self.max_batch = max_batch
+        self.batch_wait_ms = batch_wait_ms
+        self.batchers = {}
+        self.started = time.time()
+
+    def _batcher(self, name, options):
+        key = (name, tuple(sorted(options.items())))
+        batcher = self.batchers.get(key)
+        if batcher is None:
+            adapter = self.adapters[name]
+
+            def run(X):
+                with metrics.profile(name, "batch"):
+                    return adapter.predict(X, **options)
+
+            batcher = self.batchers[key] = MicroBatcher(
+                run, max_rows=self.max_batch, max_wait_ms=self.batch_wait_ms,
+                executor=self.executor, name=":".join([name] + [str(v) for v in options.values()]))
+        return batcher
+
+    # ---------------- routes ----------------
+
+    async def health(self):
+        return {"status": "ok", "models": list(self.adapters),
+                "uptime_s": round(time.time() - self.started, 3)}
+
+    async def stats(self):
+        return {batcher.name: batcher.stats() for batcher in self.batchers.values()}
+
+    async def models(self):
+        described = {}
+        for name, adapter in self.adapters.items():
+            info = {"features": list(adapter.features)}
+            if hasattr(adapter, "methods"):
+                info["methods"] = list(adapter.methods) + ["all"]
+            described[name] = info
+        return described
+
+    async def predict(self, name, payload):
+        adapter = self.adapters.get(name)
+        if adapter is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown model {name!r}")
+        if not isinstance(payload, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+
+        if "instances" in payload:
+            instances = payload["instances"]
+        elif "instance" in payload:
+            instances = [payload["instance"]]
+        else:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body needs 'instances' or 'instance'")
+
+        options = {}
+        if hasattr(adapter, "methods"):
+            options["method"] = payload.get("method", adapter.methods[0])
+            if options["method"] not in adapter.methods and options["method"] != "all":
+                raise HTTPError(HTTPStatus.BAD_REQUEST,
+                                f"Unknown method {options['method']!r}")
+
+        with metrics.stage(name, "request"):
+            try:
+                X = adapter.prepare(instances)
+            except ValueError as e:
+                raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+
+            predictions = await asyncio.wrap_future(self._batcher(name, options).submit(X))
+        return {"model": name, "predictions": predictions}
+
+    async def dispatch(self, method, path, body):
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        if method == "GET" and path == "/health":
+            return await self.health()
+        if method == "GET" and path == "/models":
+            return await self.models()
+        if method == "GET" and path == "/stats":
+            return await self.stats()
+        if method == "GET" and path == "/metrics":
+            return metrics.render_prometheus()
+        if path.startswith("/predict/"):
+            if method != "POST":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST")
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON")
+            return await self.predict(path[len("/predict/"):], payload)
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {method} {path}")
+
+    # ---------------- HTTP/1.1 ----------------
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST,
+                                        {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version == "HTTP/1.1")
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST,
+                                        {"error": "Invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                        {"error": "Body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, result = HTTPStatus.OK, await self.dispatch(method, path, body)
+                except HTTPError as e:
+                    status, result = e.status, {"error": e.message}
+                except Exception as e:  # keep serving after an unexpected failure
+                    status, result = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+                await self._respond(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, result, keep_alive):
+        # Routes return dicts (JSON) except /metrics, which returns text
+        if isinstance(result, str):
+            body, content_type = result.encode(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(result).encode(), "application/json"
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        addresses = ", ".join(str(s.getsockname()) for s in server.sockets)
+        print(f"Serving {', '.join(self.adapters)} on {addresses}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP/JSON inference for all five models.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--models", nargs="+", default=None,
+                        help="subset of models to load (default: all)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="predict threads (default: CPU count)")
+    parser.add_argument("--max-batch", type=int, default=256,
+                        help="max rows per micro-batch (default: %(default)s)")
+    parser.add_argument("--batch-wait-ms", type=float, default=2.0,
+                        help="how long to collect a micro-batch (default: %(default)s)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="record per-stage timings for GET /metrics")
+    parser.add_argument("--metrics-log-interval", type=float, default=0,
+                        help="also print a timing summary every N seconds (default: off)")
+    args = parser.parse_args(argv)
+    if args.metrics or args.metrics_log_interval:
+        metrics.enable()
+    if args.metrics_log_interval:
+        metrics.start_reporter(args.metrics_log_interval)
+
+    start = time.perf_counter()
+    adapters = load_adapters(args.models)
+    print(f"Loaded {len(adapters)} models in {time.perf_counter() - start:.2f}s", flush=True)
+
+    server = InferenceServer(adapters, workers=args.workers, max_batch=args.max_batch,
+                             batch_wait_ms=args.batch_wait_ms)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# =========================================
+# Cold-Start Helpers
+# =========================================
+"""Get the Streamlit apps on screen before their models are loaded.
+
+A fresh container spends most of an app's first run importing sklearn
+(pulled in by unpickling) and deserializing artifacts, all before the first
+paint.  With ``PREDICT_FAST_START=1`` each app instead calls :func:`prewarm`
+at the top of the script, which loads its artifacts through the shared
+registry and runs one dummy prediction on a background thread while the page
+renders.  The prediction path calls the same loader later; the registry's
+per-artifact lock makes it wait for (rather than repeat) a load still in
+progress, and it is an instant cache hit afterwards.
+
+Where startup time goes can be measured per app::
+
+    python -m common.startup                    # all apps
+    python -m common.startup kmeans --top 15
+    PREDICT_FAST_START=1 python -m common.startup
+
+Each app script runs once in a fresh interpreter under ``-X importtime``
+(Streamlit "bare" mode: widgets return their defaults and nothing is
+served).  The report splits the wall time into importing Streamlit, running
+the script up to the end of the first paint, and waiting for prewarm
+threads, and lists the packages whose imports cost the most.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FAST_START = os.environ.get("PREDICT_FAST_START", "0") == "1"
+
+_prewarms = {}
+_prewarms_lock = threading.Lock()
+
+
+def prewarm(name, load, warm=None):
+    """Run ``load()`` then ``warm(loaded)`` on a daemon thread, once per process.
+
+    Returns a ``Future`` of the loaded value.  Failures are printed and left
+    on the future; the foreground call to ``load`` reports them properly.
+    """
+    with _prewarms_lock:
+        future = _prewarms.get(name)
+        if future is not None:
+            return future
+        future = _prewarms[name] = Future()
+
+    def run():
+        try:
+            loaded = load()
+            if warm is not None:
+                warm(loaded)
+        except Exception as e:
+            print(f"prewarm {name} failed:", flush=True)
+            traceback.print_exc()
+            future.set_exception(e)
+        else:
+            future.set_result(loaded)
+
+    threading.Thread(target=run, name=f"prewarm-{name}", daemon=True).start()
+    return future
+
+
+def wait_prewarmed(timeout=None):
+    """Block until every prewarm started so far has finished; returns their names."""
+    with _prewarms_lock:
+        started = dict(_prewarms)
+    for future in started.values():
+        future.exception(timeout)
+    return sorted(started)
+
+
+# ---------------- import-time report ----------------
+
+def _worker(script):
+    start = time.perf_counter()
+    import streamlit  # noqa: F401
+
+    imported = time.perf_counter()
+    # As ``streamlit run`` does: the script's folder is importable
+    sys.path.insert(0, os.path.dirname(script))
+    import runpy
+
+    runpy.run_path(script, run_name="__main__")
+    painted = time.perf_counter()
+    # This file runs as __main__ here; the apps use the importable module
+    from common import startup
+
+    prewarmed = startup.wait_prewarmed()
+    ready = time.perf_counter()
+    print(json.dumps({"streamlit_s": imported - start, "first_paint_s": painted - start,
+                      "ready_s": ready - start, "prewarmed": prewarmed}))
+
+
+def _parse_importtime(stderr):
+    """Self time (seconds) per top-level package from ``-X importtime`` output."""
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        root = name.strip().split(".")[0]
+        packages[root] = packages.get(root, 0.0) + int(self_us) / 1e6
+    return packages
+
+
+def measure(app, script):
+    """Run ``script`` once in a fresh interpreter and return its timings."""
+    cmd = [sys.executable, "-X", "importtime", "-m", "common.startup", "--worker", script]
+    proc = subprocess.run(cmd, cwd=ROOT_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"app": app, "error": proc.stderr.strip().splitlines()[-1:] or ["failed"]}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    packages = _parse_importtime(proc.stderr)
+    result.update(app=app, imports_s=sum(packages.values()),
+                  packages=sorted(packages.items(), key=lambda item: -item[1]))
+    return result
+
+
+def print_report(result, top=10):
+    if "error" in result:
+        print(f"{result['app']:<11} ERROR {result['error'][0]}")
+        return
+    print(f"{result['app']:<11} first paint {result['first_paint_s']:5.2f}s  "
+          f"ready {result['ready_s']:5.2f}s  (streamlit {result['streamlit_s']:.2f}s, "
+          f"all imports {result['imports_s']:.2f}s"
+          + (f", prewarmed: {', '.join(result['prewarmed'])}" if result["prewarmed"] else "")
+          + ")")
+    for package, seconds in result["packages"][:top]:
+        print(f"    {package:<24} {seconds * 1e3:8.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show where each app's cold start goes.")
+    parser.add_argument("apps", nargs="*", help="apps to measure (default: all)")
+    parser.add_argument("--top", type=int, default=10,
+                        help="packages listed per app (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        _worker(args.worker)
+        return
+
+    from common.adapters import PROJECT_DIRS
+
+    unknown = [app for app in args.apps if app not in PROJECT_DIRS]
+    if unknown:
+        parser.error(f"unknown apps: {', '.join(unknown)}")
+
+    results = [measure(app, os.path.join(PROJECT_DIRS[app], "app.py"))
+               for app in args.apps or PROJECT_DIRS]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"PREDICT_FAST_START={'1' if FAST_START else '0'}")
+    for result in results:
+        print_report(result, args.top)
+
+
+if __name__ == "__main__":
+    main()
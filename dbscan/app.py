@@ -4,8 +4,20 @@
 
 import streamlit as st
 import numpy as np
-import joblib
 import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from common import metrics
+from common.startup import FAST_START, prewarm
+
+# Set DBSCAN_GRID_INDEX=1 to assign through the eps-grid hash instead of a
+# KD-tree (faster for very large core sets with sparse cells)
+USE_GRID_INDEX = os.environ.get("DBSCAN_GRID_INDEX", "0") == "1"
 
 # =========================================
 # Page Configuration
@@ -24,15 +36,32 @@ st.write("Enter feature values to understand which region the point belongs to."
 # Load Saved DBSCAN Model
 # =========================================
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-model_path = os.path.join(BASE_DIR, "dbscan.pkl")
-
-try:
-    dbscan = joblib.load(model_path)
-except Exception as e:
-    st.error("❌ dbscan.pkl not found in the same folder.")
-    st.write(e)
-    st.stop()
+def load_assigner():
+    """The core-sample index, built once per model version by the registry."""
+    from assign import DBSCANAssigner
+    from grid_index import GridIndex
+    from common.bundle import bundle_path, has_bundle, load_bundle
+    from common.registry import load_artifact
+
+    index_type = GridIndex if USE_GRID_INDEX else DBSCANAssigner
+    # Core samples written by train_dbscan.py, memory-mapped from the bundle
+    model_bundle = bundle_path(BASE_DIR)
+    if has_bundle(model_bundle):
+        return load_bundle(model_bundle, derive=index_type.from_bundle)
+    return load_artifact(os.path.join(BASE_DIR, "dbscan.pkl"), derive=index_type.from_estimator)
+
+
+if FAST_START:
+    # Loaded and warmed up in the background while the page renders
+    prewarm("dbscan", load_assigner, lambda assigner: assigner.predict(np.zeros((1, 2))))
+else:
+    try:
+        load_assigner()
+    except Exception as e:
+        st.error("❌ Could not load the DBSCAN model: expected bundle/ (written by "
+                 "train_dbscan.py) or, as a fallback, dbscan.pkl in the same folder.")
+        st.write(e)
+        st.stop()
 
 # =========================================
 # Input Section
@@ -57,13 +86,10 @@ input_point = np.array([[f1, f2]])
 if st.button("🚀 Predict Cluster"):
 
     try:
-        # DBSCAN has no direct predict(), so we simulate
-        combined_data = np.vstack([dbscan.components_, input_point])
-
-        new_model = dbscan
-        new_model.fit(combined_data)
-
-        prediction = new_model.labels_[-1]
+        assigner = load_assigner()
+        # DBSCAN has no direct predict(), so assign to the nearest core sample
+        with metrics.profile("dbscan"), metrics.stage("dbscan", "predict"):
+            prediction = assigner.predict(input_point)[0]
 
         st.subheader("📊 Result")
 
@@ -0,0 +1,149 @@
+# =========================================
+# DBSCAN Out-of-Sample Assignment
+# =========================================
+"""Label new points against a fitted DBSCAN model without refitting it.
+
+DBSCAN has no ``predict``: a new point belongs to a cluster when it lies
+within ``eps`` of one of that cluster's core samples, otherwise it is noise
+(-1).  The core samples are indexed once in a KD-tree (ball tree for
+non-Minkowski metrics), so each query is a single nearest-neighbour lookup
+and the fitted estimator is never mutated.
+
+:class:`CoreSamples` is everything assignment needs (core points, their
+labels, ``eps`` and the metric).  It can be taken from a fitted estimator,
+from the artifact bundle written by ``train_dbscan.py`` (core points
+memory-mapped) or from a single ``.npz`` file.
+"""
+
+import os
+from typing import NamedTuple
+
+import numpy as np
+from sklearn.neighbors import BallTree, KDTree
+
+NOISE = -1
+
+
+class CoreSamples(NamedTuple):
+    """The part of a fitted DBSCAN model that out-of-sample assignment uses."""
+
+    core_points: np.ndarray
+    core_labels: np.ndarray
+    eps: float
+    metric: str = "euclidean"
+
+    @classmethod
+    def from_estimator(cls, dbscan):
+        metric = dbscan.metric
+        if metric == "minkowski" and dbscan.p in (None, 2):
+            metric = "euclidean"
+        return cls(dbscan.components_, dbscan.labels_[dbscan.core_sample_indices_],
+                   float(dbscan.eps), metric)
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        """Core samples from a :class:`common.bundle.Bundle`."""
+        return cls(bundle["core_points"], bundle["core_labels"], float(bundle.metadata["eps"]),
+                   bundle.metadata.get("metric", "euclidean"))
+
+    def bundle_members(self):
+        """``(members, metadata)`` for :func:`common.bundle.write_bundle`."""
+        members = {"core_points": np.asarray(self.core_points, dtype=np.float64),
+                   "core_labels": np.asarray(self.core_labels, dtype=np.int64)}
+        return members, {"eps": self.eps, "metric": self.metric}
+
+    def save(self, path, **metadata):
+        """Write an uncompressed ``.npz``; extra scalars are stored alongside.
+
+        The file is replaced atomically, so a running app never reads a
+        half-written artifact.
+        """
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, core_points=self.core_points, core_labels=self.core_labels,
+                     eps=self.eps, metric=self.metric, **metadata)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["core_points"], data["core_labels"], float(data["eps"]),
+                       str(data["metric"]))
+
+
+class DBSCANAssigner:
+    """Nearest-core-sample assignment for a fitted DBSCAN model."""
+
+    def __init__(self, core_points, core_labels, eps, metric="euclidean", leaf_size=30):
+        core_points = np.ascontiguousarray(core_points, dtype=np.float64)
+        core_labels = np.asarray(core_labels, dtype=np.int64)
+
+        if core_points.ndim != 2:
+            raise ValueError("core_points must be a 2-D array")
+        if len(core_points) != len(core_labels):
+            raise ValueError("core_points and core_labels must have the same length")
+
+        self.core_points = core_points
+        self.core_labels = core_labels
+        self.eps = float(eps)
+        self.metric = metric
+        self.n_features = core_points.shape[1]
+
+        if len(core_points) == 0:
+            self._tree = None
+        elif metric in KDTree.valid_metrics:
+            self._tree = KDTree(core_points, leaf_size=leaf_size, metric=metric)
+        else:
+            self._tree = BallTree(core_points, leaf_size=leaf_size, metric=metric)
+
+    @classmethod
+    def from_estimator(cls, dbscan):
+        """Build an assigner from a fitted ``sklearn.cluster.DBSCAN``."""
+        core_labels = dbscan.labels_[dbscan.core_sample_indices_]
+        return cls(
+            dbscan.components_,
+            core_labels,
+            dbscan.eps,
+            metric=dbscan.metric,
+            leaf_size=dbscan.leaf_size,
+        )
+
+    @classmethod
+    def from_core(cls, core, **options):
+        """Build an assigner from :class:`CoreSamples`."""
+        return cls(core.core_points, core.core_labels, core.eps, metric=core.metric, **options)
+
+    @classmethod
+    def from_bundle(cls, bundle, **options):
+        return cls.from_core(CoreSamples.from_bundle(bundle), **options)
+
+    def _check(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected points with {self.n_features} features, got shape {X.shape}"
+            )
+        return X
+
+    def query(self, X):
+        """Return ``(labels, distances)`` to the nearest core sample.
+
+        Accepts a single point (1-D) or a batch (2-D).  Points farther than
+        ``eps`` from every core sample are labelled ``-1``.
+        """
+        X = self._check(X)
+
+        if self._tree is None:
+            return np.full(len(X), NOISE, dtype=np.int64), np.full(len(X), np.inf)
+
+        dist, idx = self._tree.query(X, k=1)
+        dist = dist[:, 0]
+        labels = self.core_labels[idx[:, 0]]
+        labels = np.where(dist <= self.eps, labels, NOISE)
+        return labels, dist
+
+    def predict(self, X):
+        """Return the cluster label for each point (``-1`` for noise)."""
+        return self.query(X)[0]
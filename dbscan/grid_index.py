@@ -0,0 +1,216 @@
+# =========================================
+# Grid-Hashed DBSCAN Assignment
+# =========================================
+"""Assign points to DBSCAN clusters through a uniform grid of eps-sized cells.
+
+Every core sample is bucketed into the cell ``floor((x - origin) / eps)``.
+Any core sample within ``eps`` of a query lies in the query's cell or one of
+its neighbours, so a lookup only has to inspect those ``3**d`` cells.
+Each cell's integer coordinates are packed into one int64 key.  The core
+points are stored sorted by key, so a cell is a contiguous slice found by
+binary search.
+
+:meth:`GridIndex.query` is vectorized over a batch: for each of the ``3**d``
+offsets it gathers all (query, candidate) pairs at once and keeps the
+closest candidate per query.  Labels are exact; DBSCAN only cares whether a
+core point is within ``eps``.  Distances are exact whenever they are at most
+``eps``.  For noise points they are the closest core sample in the
+neighbouring cells (``inf`` if there is none).  A KD-tree
+(:class:`assign.DBSCANAssigner`) gives the true distance for those.
+
+The artifact bundle stores the core samples already sorted by cell, plus
+the cell table (:func:`bundle_members`).  :meth:`GridIndex.from_bundle`
+then queries the memory-mapped arrays directly, so several worker processes
+share one copy of millions of core points through the page cache.
+"""
+
+import itertools
+
+import numpy as np
+
+from assign import CoreSamples
+
+NOISE = -1
+DEFAULT_BLOCK_SIZE = 4096
+
+
+class GridIndex:
+    """Eps-grid lookup over DBSCAN core samples (Euclidean distance)."""
+
+    def __init__(self, points, labels, cell_keys, cell_starts, eps, origin, shape,
+                 block_size=DEFAULT_BLOCK_SIZE):
+        self.points = points
+        self.labels = labels
+        self.cell_keys = cell_keys
+        self.cell_starts = cell_starts
+        self.eps = float(eps)
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.shape = np.asarray(shape, dtype=np.int64)
+        self.n_features = len(self.origin)
+        self.block_size = int(block_size)
+
+        # Row-major strides for packing cell coordinates into one key
+        self._strides = np.ones(self.n_features, dtype=np.int64)
+        for j in range(self.n_features - 2, -1, -1):
+            self._strides[j] = self._strides[j + 1] * self.shape[j + 1]
+        self._offsets = np.array(list(itertools.product((-1, 0, 1), repeat=self.n_features)),
+                                 dtype=np.int64)
+
+    @classmethod
+    def build(cls, core_points, core_labels, eps, **options):
+        core_points = np.ascontiguousarray(core_points, dtype=np.float64)
+        core_labels = np.asarray(core_labels, dtype=np.int64)
+        if core_points.ndim != 2:
+            raise ValueError("core_points must be a 2-D array")
+        if len(core_points) != len(core_labels):
+            raise ValueError("core_points and core_labels must have the same length")
+        if eps <= 0:
+            raise ValueError("eps must be positive")
+
+        d = core_points.shape[1]
+        if len(core_points) == 0:
+            origin, shape = np.zeros(d), np.ones(d, dtype=np.int64)
+        else:
+            origin = core_points.min(axis=0)
+            shape = np.floor((core_points.max(axis=0) - origin) / eps).astype(np.int64) + 1
+        if np.prod(shape.astype(float)) >= 2 ** 62:
+            raise ValueError("Too many grid cells for int64 keys; use DBSCANAssigner instead")
+
+        index = cls(core_points, core_labels, np.empty(0, np.int64), np.zeros(1, np.int64),
+                    eps, origin, shape, **options)
+        keys = index._keys(index._cells(core_points))
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        cell_keys, starts = np.unique(keys, return_index=True)
+
+        index.points = core_points[order]
+        index.labels = core_labels[order]
+        index.cell_keys = cell_keys
+        index.cell_starts = np.append(starts, len(keys)).astype(np.int64)
+        return index
+
+    @classmethod
+    def from_estimator(cls, dbscan, **options):
+        """Build the index from a fitted ``sklearn.cluster.DBSCAN``."""
+        metric = dbscan.metric
+        if not (metric == "euclidean" or (metric == "minkowski" and dbscan.p in (None, 2))):
+            raise ValueError(f"GridIndex needs Euclidean distance, model uses {metric!r}")
+        core_labels = dbscan.labels_[dbscan.core_sample_indices_]
+        return cls.build(dbscan.components_, core_labels, dbscan.eps, **options)
+
+    @classmethod
+    def from_core(cls, core, **options):
+        """Build the index from :class:`assign.CoreSamples`."""
+        if core.metric != "euclidean":
+            raise ValueError(f"GridIndex needs Euclidean distance, model uses {core.metric!r}")
+        return cls.build(core.core_points, core.core_labels, core.eps, **options)
+
+    @classmethod
+    def from_bundle(cls, bundle, **options):
+        """Index over the bundle's arrays, memory-mapped as they are.
+
+        Bundles written by :func:`bundle_members` store the core samples
+        already sorted by cell, with the cell table alongside, so nothing is
+        copied.  Older bundles are sorted in memory.
+        """
+        grid = bundle.metadata.get("grid")
+        if grid is None or "grid.cell_keys" not in bundle:
+            return cls.from_core(CoreSamples.from_bundle(bundle), **options)
+        return cls(bundle["core_points"], bundle["core_labels"], bundle["grid.cell_keys"],
+                   bundle["grid.cell_starts"], bundle.metadata["eps"], grid["origin"],
+                   grid["shape"], **options)
+
+    # ---------------- lookup ----------------
+
+    def _cells(self, X):
+        # Clipping keeps far-away queries out of range without int64 overflow
+        cells = np.floor((X - self.origin) / self.eps)
+        return np.clip(cells, -2, self.shape + 1).astype(np.int64)
+
+    def _keys(self, cells):
+        return cells @ self._strides
+
+    def _check(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected points with {self.n_features} features, got shape {X.shape}"
+            )
+        return X
+
+    def _query_block(self, X):
+        n = len(X)
+        best = np.full(n, np.inf)
+        best_label = np.full(n, NOISE, dtype=np.int64)
+
+        # Keys of all 3**d neighbouring cells of every query, shape (n, 3**d)
+        neighbours = self._cells(X)[:, np.newaxis, :] + self._offsets
+        inside = ((neighbours >= 0) & (neighbours < self.shape)).all(axis=2)
+        keys = self._keys(np.where(inside[..., np.newaxis], neighbours, 0))
+        pos = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+        found = inside & (self.cell_keys[pos] == keys)
+
+        # Expand every (query, candidate) pair at once; pairs stay grouped by query
+        cells = pos[found]
+        queries = np.nonzero(found)[0]
+        starts = self.cell_starts[cells]
+        counts = self.cell_starts[cells + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return best_label, best
+
+        q = np.repeat(queries, counts)
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        candidates = np.repeat(starts, counts) + (np.arange(total) - first)
+        diff = X[q] - self.points[candidates]
+        d2 = np.einsum("ij,ij->i", diff, diff)
+
+        # Closest candidate per query with one segmented reduction
+        per_query = np.bincount(q, minlength=n)
+        hit = np.flatnonzero(per_query)
+        segment_min = np.minimum.reduceat(d2, np.cumsum(per_query[hit]) - per_query[hit])
+        nearest = d2 == np.repeat(segment_min, per_query[hit])
+        best[hit] = np.sqrt(segment_min)
+        best_label[q[nearest]] = self.labels[candidates[nearest]]
+
+        return np.where(best <= self.eps, best_label, NOISE), best
+
+    def query(self, X):
+        """Return ``(labels, distances)`` to the nearest core sample.
+
+        Accepts a single point (1-D) or a batch (2-D); points farther than
+        ``eps`` from every core sample are labelled ``-1``.
+        """
+        X = self._check(X)
+        if len(self.cell_keys) == 0:
+            return np.full(len(X), NOISE, dtype=np.int64), np.full(len(X), np.inf)
+
+        parts = [self._query_block(X[i:i + self.block_size])
+                 for i in range(0, len(X), self.block_size)] or [self._query_block(X)]
+        return (np.concatenate([p[0] for p in parts]),
+                np.concatenate([p[1] for p in parts]))
+
+    def predict(self, X):
+        """Return the cluster label for each point (``-1`` for noise)."""
+        return self.query(X)[0]
+
+
+def bundle_members(core):
+    """``(members, metadata)`` for :func:`common.bundle.write_bundle`.
+
+    Like :meth:`assign.CoreSamples.bundle_members`, with the core samples
+    sorted by grid cell and the cell table added.  The KD-tree assigner does
+    not depend on point order.  When no grid fits (non-Euclidean metric or
+    too many cells) the plain members are returned.
+    """
+    members, metadata = core.bundle_members()
+    try:
+        index = GridIndex.from_core(core)
+    except ValueError:
+        return members, metadata
+    members.update({"core_points": index.points, "core_labels": index.labels,
+                    "grid.cell_keys": index.cell_keys, "grid.cell_starts": index.cell_starts})
+    metadata["grid"] = {"origin": index.origin.tolist(), "shape": index.shape.tolist()}
+    return members, metadata
@@ -0,0 +1,260 @@
+# =========================================
+# DBSCAN Training (Precomputed Neighbour Graph)
+# =========================================
+"""Fit DBSCAN on large point sets with bounded memory.
+
+DBSCAN only ever asks "which points are within ``eps``?".  Here those
+neighbourhoods are found ``chunk_size`` query rows at a time against one
+shared KD-tree (ball tree for other metrics) and packed straight into a
+sparse CSR graph.  The graph has int32 column indices and explicit float32
+zeros as values, because every stored pair is within ``eps`` by
+construction.  That is 8 bytes per neighbour pair, with no distance arrays
+and no per-point Python lists kept around.  With ``n_jobs > 1`` chunks are
+queried in worker processes, since tree queries hold the GIL.
+
+The graph is then labelled one of two ways, with identical results:
+
+* ``components`` (default) – :func:`label_graph` takes the connected
+  components of the core-to-core edges.  Its peak memory is about the
+  graph itself, below sklearn's own DBSCAN on the raw points.
+* ``precomputed`` – ``DBSCAN(metric="precomputed").fit(graph)``.  sklearn
+  copies the graph twice and expands it into int64 neighbourhoods, so this
+  peaks at roughly three times the memory of ``components``.
+
+Only what assignment needs is saved: core points, their cluster labels and
+``eps`` (:class:`assign.CoreSamples`).  They are written as the artifact
+bundle in ``bundle/`` (see :mod:`common.bundle`), which the app loads
+instead of the pickled estimator when it is present, or as a single
+``.npz`` when ``--output`` ends in ``.npz``.
+
+Usage::
+
+    python train_dbscan.py blobs.csv --eps 0.3 --min-samples 20 --n-jobs 4
+    python train_dbscan.py blobs.npy --method precomputed
+    python train_dbscan.py --from-estimator dbscan.pkl   # convert an old model
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import DBSCAN
+from sklearn.neighbors import BallTree, KDTree
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from common.bundle import bundle_path, write_bundle
+
+from assign import NOISE, CoreSamples
+from grid_index import bundle_members
+
+DEFAULT_CHUNK_SIZE = 20000
+METHODS = ("components", "precomputed")
+
+
+# Set in each worker process (inherited directly when forked)
+_shared = {}
+
+
+def _init_worker(tree, X, eps):
+    _shared.update(tree=tree, X=X, eps=eps)
+
+
+def _neighbours(bounds):
+    """Row lengths and int32 column indices for query rows ``start:stop``."""
+    start, stop = bounds
+    ind = _shared["tree"].query_radius(_shared["X"][start:stop], _shared["eps"])
+    counts = np.fromiter(map(len, ind), dtype=np.int64, count=len(ind))
+    indices = np.concatenate(ind).astype(np.int32) if len(ind) else np.empty(0, np.int32)
+    return counts, indices
+
+
+def radius_graph(X, eps, chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=1, metric="euclidean"):
+    """Sparse CSR eps-neighbourhood graph of ``X`` (self-loops included).
+
+    Values are explicit zeros: every stored pair is within ``eps``, which is
+    all DBSCAN's precomputed mode looks at.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    tree_type = KDTree if metric in KDTree.valid_metrics else BallTree
+    tree = tree_type(X, metric=metric)
+    bounds = [(start, min(start + chunk_size, len(X))) for start in range(0, len(X), chunk_size)]
+
+    if n_jobs is not None and n_jobs > 1 and len(bounds) > 1:
+        context = multiprocessing.get_context("fork") if sys.platform.startswith("linux") else None
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context,
+                                 initializer=_init_worker, initargs=(tree, X, eps)) as executor:
+            parts = list(executor.map(_neighbours, bounds))
+    else:
+        _init_worker(tree, X, eps)
+        try:
+            parts = [_neighbours(b) for b in bounds]
+        finally:
+            _shared.clear()
+
+    indptr = np.zeros(len(X) + 1, dtype=np.int64)
+    np.cumsum(np.concatenate([counts for counts, _ in parts]), out=indptr[1:])
+    indices = np.concatenate([indices for _, indices in parts])
+    del parts
+    if indptr[-1] < np.iinfo(np.int32).max:
+        indptr = indptr.astype(np.int32)
+    data = np.zeros(len(indices), dtype=np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(X), len(X)))
+
+
+def label_graph(graph, min_samples):
+    """DBSCAN labels and core sample indices straight from an eps graph.
+
+    Gives the same result as ``DBSCAN(metric="precomputed").fit(graph)``
+    without the copies sklearn makes of the graph.  Clusters are the
+    connected components of the core-to-core edges, numbered in order of
+    their first core point.  A border point joins the lowest-numbered
+    cluster among its core neighbours, the one sklearn's scan reaches first.
+    """
+    indptr, indices = graph.indptr, graph.indices
+    n = graph.shape[0]
+    core = np.diff(indptr) >= min_samples
+    core_indices = np.flatnonzero(core)
+    labels = np.full(n, NOISE, dtype=np.int64)
+    if len(core_indices) == 0:
+        return labels, core_indices
+
+    # Core-to-core edges only.  Every row holds its own point, so no row is
+    # empty for reduceat; the zero data is never read
+    keep = core[indices]
+    keep &= np.repeat(core, np.diff(indptr))
+    core_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.add.reduceat(keep, indptr[:-1], dtype=np.int64), out=core_indptr[1:])
+    core_graph = sparse.csr_matrix((np.zeros(int(core_indptr[-1])),
+                                    indices[keep], core_indptr), shape=(n, n))
+    del keep
+    # The graph is symmetric, so strong components are the connected ones
+    # and no transpose has to be built
+    _, component = connected_components(core_graph, directed=True, connection="strong")
+    del core_graph
+
+    # Number clusters by their first core point, as sklearn's scan does
+    core_component = component[core_indices]
+    _, first = np.unique(core_component, return_index=True)
+    cluster_of = np.empty(component.max() + 1, dtype=np.int64)
+    cluster_of[core_component[np.sort(first)]] = np.arange(len(first))
+    labels[core_indices] = cluster_of[core_component]
+
+    # Border points: smallest cluster id among core neighbours
+    unset = np.iinfo(np.int32).max
+    core_label = np.where(core, labels, unset).astype(np.int32)
+    nearest = np.minimum.reduceat(core_label[indices], indptr[:-1])
+    border = ~core & (nearest != unset)
+    labels[border] = nearest[border]
+    return labels, core_indices
+
+
+def train(X, eps, min_samples, chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=1, metric="euclidean",
+          method="components"):
+    """Return ``(labels, core_samples, timings)`` for points ``X``.
+
+    ``method`` is ``"components"`` (:func:`label_graph`) or ``"precomputed"``
+    (sklearn's DBSCAN on the same graph).
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    timings = {}
+
+    start = time.perf_counter()
+    graph = radius_graph(X, eps, chunk_size=chunk_size, n_jobs=n_jobs, metric=metric)
+    timings["graph"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if method == "precomputed":
+        dbscan = DBSCAN(eps=eps, min_samples=min_samples, metric="precomputed").fit(graph)
+        labels, core_indices = dbscan.labels_, dbscan.core_sample_indices_
+    else:
+        labels, core_indices = label_graph(graph, min_samples)
+    timings["labels"] = time.perf_counter() - start
+
+    core = CoreSamples(X[core_indices], labels[core_indices], float(eps),
+                       "euclidean" if metric == "minkowski" else metric)
+    return labels, core, timings
+
+
+def load_points(path, columns=None):
+    """``(points, feature_names)`` from a ``.npy`` file or the numeric columns of a CSV."""
+    if path.endswith(".npy"):
+        X = np.load(path)
+        return X, columns or [f"f{j + 1}" for j in range(X.shape[1])]
+    df = pd.read_csv(path)
+    if columns:
+        df = df[columns]
+    else:
+        df = df.select_dtypes(include="number")
+    return df.to_numpy(dtype=np.float64), list(df.columns)
+
+
+def save_core(core, path, features=None, **metadata):
+    """Write ``core`` as a bundle directory, or as one ``.npz`` file."""
+    if path.endswith(".npz"):
+        core.save(path, **metadata)
+        return
+    members, core_metadata = bundle_members(core)
+    write_bundle(path, members, features=features, metadata={**core_metadata, **metadata})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train DBSCAN and save its core samples.")
+    parser.add_argument("data", nargs="?", help=".npy or CSV of points")
+    parser.add_argument("--columns", nargs="+", default=None,
+                        help="CSV feature columns (default: all numeric columns)")
+    parser.add_argument("--eps", type=float, default=0.3)
+    parser.add_argument("--min-samples", type=int, default=20)
+    parser.add_argument("--metric", default="euclidean")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="query rows per graph chunk (default: %(default)s)")
+    parser.add_argument("--n-jobs", type=int, default=1,
+                        help="worker processes building graph chunks (default: %(default)s)")
+    parser.add_argument("--method", choices=METHODS, default=METHODS[0],
+                        help="how the neighbour graph is labelled (default: %(default)s)")
+    parser.add_argument("--from-estimator", default=None,
+                        help="convert a pickled DBSCAN instead of training")
+    parser.add_argument("--output", default=bundle_path(BASE_DIR),
+                        help="bundle directory, or a .npz file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.from_estimator:
+        import joblib
+
+        dbscan = joblib.load(args.from_estimator)
+        core = CoreSamples.from_estimator(dbscan)
+        features = [f"f{j + 1}" for j in range(core.core_points.shape[1])]
+        features = list(getattr(dbscan, "feature_names_in_", features))
+        save_core(core, args.output, features, min_samples=dbscan.min_samples)
+        print(f"Wrote {len(core.core_points)} core samples to {args.output}")
+        return
+
+    if not args.data:
+        parser.error("data is required unless --from-estimator is given")
+
+    X, features = load_points(args.data, args.columns)
+    labels, core, timings = train(X, args.eps, args.min_samples, chunk_size=args.chunk_size,
+                                  n_jobs=args.n_jobs, metric=args.metric, method=args.method)
+    save_core(core, args.output, features, min_samples=args.min_samples, n_samples=len(X))
+
+    n_clusters = len(set(labels.tolist()) - {NOISE})
+    print(f"{len(X)} points: {n_clusters} clusters, {len(core.core_points)} core samples, "
+          f"{int((labels == NOISE).sum())} noise")
+    print("Timings:", ", ".join(f"{k}={v:.2f}s" for k, v in timings.items()))
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
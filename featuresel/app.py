@@ -4,7 +4,23 @@
 
 import streamlit as st
 import numpy as np
-import joblib
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from common import metrics
+from common.prediction_cache import get_cache
+from common.startup import FAST_START, prewarm
+
+from model_pool import MODEL_FILES, ORIGINAL_FEATURES, get_pool
+
+# Set FEATURESEL_LAZY=1 and/or FEATURESEL_MAX_MODELS=<n> on small hosts
+LAZY_LOAD = os.environ.get("FEATURESEL_LAZY", "0") == "1"
+MAX_MODELS = int(os.environ["FEATURESEL_MAX_MODELS"]) if os.environ.get("FEATURESEL_MAX_MODELS") else None
 
 # =========================================
 # Page Configuration
@@ -54,19 +70,22 @@ st.markdown("<h1>🚢 Titanic Survival Prediction App</h1>", unsafe_allow_html=T
 # =========================================
 # Load Models
 # =========================================
-models = {
-    "Chi-Square": "model_chi_square.pkl",
-    "Information Gain": "model_information_gain.pkl",
-    "Fisher Score": "model_fisher.pkl",
-    "Forward Selection": "model_forward.pkl",
-    "Backward Elimination": "model_backward.pkl",
-    "RFE": "model_rfe.pkl",
-    "Exhaustive Selection": "model_exhaustive.pkl"
-}
+def load_pool():
+    return get_pool(BASE_DIR, lazy=LAZY_LOAD, max_resident=MAX_MODELS)
+
+
+def warm_up(pool):
+    model, project = pool.get(next(iter(MODEL_FILES)))
+    model.predict(project(np.zeros((1, len(ORIGINAL_FEATURES)))))
+
 
-selected_model_name = st.selectbox("🔍 Select Feature Selection Method", list(models.keys()))
+if FAST_START:
+    # Unpickled and warmed up in the background while the page renders
+    prewarm("featuresel", load_pool, warm_up)
+else:
+    load_pool()
 
-model, selector = joblib.load(models[selected_model_name])
+selected_model_name = st.selectbox("🔍 Select Feature Selection Method", list(MODEL_FILES.keys()))
 
 # =========================================
 # Input Section
@@ -95,26 +114,44 @@ input_data = np.array([[pclass, sex, age, sibsp, parch, fare]])
 # Prediction Button
 # =========================================
 if st.button("🚀 Predict Survival"):
-
-    # Apply selector if needed
-    if hasattr(selector, "transform"):
-        input_selected = selector.transform(input_data)
-    else:
-        # For forward/backward/exhaustive (stored feature names)
-        feature_indices = []
-        original_features = ['Pclass', 'Sex', 'Age',
-                             'Siblings/Spouses Aboard',
-                             'Parents/Children Aboard',
-                             'Fare']
-
-        for feature in selector:
-            feature_indices.append(original_features.index(feature))
-
-        input_selected = input_data[:, feature_indices]
-
-    prediction = model.predict(input_selected)[0]
+    # Shared pool; waits for the prewarm thread if it is still loading
+    pool = load_pool()
+    model, project = pool.get(selected_model_name)
+
+    def predict(X):
+        with metrics.stage(f"featuresel:{selected_model_name}", "predict"):
+            return model.predict(project(X))
+
+    # Same inputs and model file as an earlier click (any session) are
+    # answered from the shared cache without touching the model
+    with metrics.profile("featuresel"):
+        prediction = get_cache().get(
+            ("featuresel", selected_model_name, pool.digest(selected_model_name)),
+            input_data,
+            predict
+        )[0]
 
     if prediction == 1:
         st.markdown('<div class="prediction-box">🎉 Passenger SURVIVED</div>', unsafe_allow_html=True)
     else:
         st.markdown('<div class="prediction-box">💀 Passenger DID NOT SURVIVE</div>', unsafe_allow_html=True)
+
+# =========================================
+# Compare All Methods
+# =========================================
+if st.button("📊 Compare All Methods"):
+    pool = load_pool()
+
+    with metrics.profile("featuresel.all"):
+        predictions, probabilities = get_cache().get(
+            ("featuresel.all",) + tuple(pool.digest(name) for name in pool.names),
+            input_data,
+            lambda X: (pool.predict_all(X), pool.predict_all(X, proba=True))
+        )
+
+    st.table({
+        "Method": list(predictions),
+        "Prediction": ["Survived" if predictions[name][0] == 1 else "Did Not Survive"
+                       for name in predictions],
+        "Survival Probability": [f"{probabilities[name][0]:.2%}" for name in probabilities]
+    })
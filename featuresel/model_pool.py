@@ -0,0 +1,198 @@
+# =========================================
+# Feature-Selection Model Pool
+# =========================================
+"""Keep the seven (model, selector) pairs resident in the process.
+
+By default every ``model_*.pkl`` is loaded concurrently on a thread pool when
+the pool is created.  On memory-constrained hosts the pool can instead load
+lazily and keep at most ``max_resident`` pairs, evicting the least recently
+used one.  A pair is reloaded when its file's mtime or size changes, and its
+SHA-256 digest is kept so results can be cached per model version.
+
+Each selector is compiled into a :class:`FeatureProjection` at load time, so
+inference is one fancy-index gather over the full feature matrix.
+
+When ``bundle/`` exists the pairs are read from that artifact bundle
+(one member per method) instead of the loose pickles, and the whole pool is
+reloaded when the bundle's manifest is republished.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+
+from common.bundle import MANIFEST_FILE, bundle_path, has_bundle, load_bundle
+from common.registry import file_digest
+
+MODEL_FILES = {
+    "Chi-Square": "model_chi_square.pkl",
+    "Information Gain": "model_information_gain.pkl",
+    "Fisher Score": "model_fisher.pkl",
+    "Forward Selection": "model_forward.pkl",
+    "Backward Elimination": "model_backward.pkl",
+    "RFE": "model_rfe.pkl",
+    "Exhaustive Selection": "model_exhaustive.pkl"
+}
+
+ORIGINAL_FEATURES = ['Pclass', 'Sex', 'Age',
+                     'Siblings/Spouses Aboard',
+                     'Parents/Children Aboard',
+                     'Fare']
+
+
+class FeatureProjection:
+    """Column projection compiled once from a fitted selector.
+
+    Sklearn selectors expose their kept columns through ``get_support`` and
+    stored name lists (forward/backward/exhaustive) are resolved against
+    ``features``; both become a precomputed index array.  Any other object
+    with a ``transform`` method is used as-is.
+    """
+
+    __slots__ = ("selector", "indices", "_transform")
+
+    def __init__(self, selector, features=ORIGINAL_FEATURES):
+        self.selector = selector
+        self._transform = None
+
+        if hasattr(selector, "get_support"):
+            self.indices = np.asarray(selector.get_support(indices=True), dtype=np.intp)
+        elif hasattr(selector, "transform"):
+            self.indices = None
+            self._transform = selector.transform
+        else:
+            position = {name: i for i, name in enumerate(features)}
+            missing = [name for name in selector if name not in position]
+            if missing:
+                raise ValueError(f"Selector refers to unknown features: {missing}")
+            self.indices = np.array([position[name] for name in selector], dtype=np.intp)
+
+    def __call__(self, X):
+        if self.indices is None:
+            return self._transform(X)
+        return X[:, self.indices]
+
+
+class ModelPool:
+    """In-process pool of (model, selector) pairs keyed by method name."""
+
+    def __init__(self, base_dir, files=MODEL_FILES, lazy=False, max_resident=None,
+                 max_workers=None):
+        if max_resident is not None and max_resident < 1:
+            raise ValueError("max_resident must be at least 1")
+
+        self.base_dir = base_dir
+        self.files = dict(files)
+        self.bundle_dir = bundle_path(base_dir) if has_bundle(bundle_path(base_dir)) else None
+        self.lazy = lazy
+        self.max_resident = max_resident
+        self._resident = OrderedDict()
+        self._lock = threading.RLock()
+
+        if not lazy:
+            names = list(self.files)
+            if max_resident is not None:
+                names = names[:max_resident]
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                loaded = list(executor.map(self._load, names))
+            with self._lock:
+                for name, entry in zip(names, loaded):
+                    self._resident[name] = entry
+
+    @property
+    def names(self):
+        return list(self.files)
+
+    def resident(self):
+        """Names of the pairs currently held in memory, oldest first."""
+        with self._lock:
+            return list(self._resident)
+
+    def _path(self, name):
+        return os.path.join(self.base_dir, self.files[name])
+
+    def _stamp(self, name):
+        if self.bundle_dir is not None:
+            st = os.stat(os.path.join(self.bundle_dir, MANIFEST_FILE))
+        else:
+            st = os.stat(self._path(name))
+        return st.st_mtime_ns, st.st_size
+
+    def _load(self, name):
+        stamp = self._stamp(name)
+        if self.bundle_dir is not None:
+            bundle = load_bundle(self.bundle_dir)
+            # Not cached by the bundle: evicting the pair must free it
+            model, selector = bundle.load(name, cache=False)
+            return stamp, (model, FeatureProjection(selector)), bundle.members[name]["sha256"]
+        digest = file_digest(self._path(name))
+        model, selector = joblib.load(self._path(name))
+        return stamp, (model, FeatureProjection(selector)), digest
+
+    def get(self, name):
+        """Return ``(model, projection)`` for a method, loading it if needed."""
+        return self._entry(name)[1]
+
+    def digest(self, name):
+        """SHA-256 of the file (or bundle member) ``name`` was loaded from."""
+        return self._entry(name)[2]
+
+    def _entry(self, name):
+        if name not in self.files:
+            raise KeyError(f"Unknown feature-selection method: {name!r}")
+
+        with self._lock:
+            entry = self._resident.get(name)
+            if entry is not None and entry[0] == self._stamp(name):
+                self._resident.move_to_end(name)
+                return entry
+
+            entry = self._load(name)
+            self._resident[name] = entry
+            self._resident.move_to_end(name)
+            if self.max_resident is not None:
+                while len(self._resident) > self.max_resident:
+                    self._resident.popitem(last=False)
+            return entry
+
+    def predict(self, name, X):
+        model, project = self.get(name)
+        return model.predict(project(X))
+
+    def predict_all(self, X, proba=False):
+        """Run the same input rows through every method.
+
+        Returns ``{method: predictions}``; with ``proba=True`` the values are
+        the positive-class probabilities instead.
+        """
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        results = {}
+        for name in self.files:
+            model, project = self.get(name)
+            X_selected = project(X)
+            if proba:
+                results[name] = model.predict_proba(X_selected)[:, 1]
+            else:
+                results[name] = model.predict(X_selected)
+        return results
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(base_dir, lazy=False, max_resident=None):
+    """Return the process-wide pool for ``base_dir``, creating it once."""
+    key = (os.path.abspath(base_dir), lazy, max_resident)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ModelPool(key[0], lazy=lazy, max_resident=max_resident)
+        return pool
@@ -0,0 +1,388 @@
+# =========================================
+# Feature-Selection Training (Pruned Subset Search)
+# =========================================
+"""Retrain the wrapper-method models: exhaustive, forward and backward.
+
+Every candidate feature subset is scored by cross-validating the app's
+model, ``LogisticRegression(max_iter=1000)``.  Wrapper searches evaluate
+many overlapping subsets, so all three share one :class:`SubsetSearch`:
+
+* the fold splits are drawn once (stratified, seeded) and reused for every
+  subset, so scores are comparable and reproducible;
+* per-fold scores are cached per subset.  Forward and backward selection
+  reuse what the exhaustive search already computed, and ``--cache``
+  keeps the cache on disk between runs (keyed on the data and CV settings);
+* candidates are scored in chunks on a process pool (``--n-jobs``);
+* a subset is abandoned once at least ``--min-folds`` folds are done and
+  its running mean is more than ``--abandon-margin`` below the best
+  complete score so far.  That is a heuristic, not an exact bound.  An
+  abandoned subset keeps its partial folds, and it is resumed if a later
+  search needs its full score.
+* ``--min-size`` / ``--max-size`` bound the subset sizes the exhaustive
+  search enumerates (2^n fits are out of reach on wide data) and cap where
+  forward selection stops and backward elimination must get to.
+
+Each result is written in the shape the app loads: ``(model, selector)`` in
+the ``MODEL_FILES`` pickle, where the selector holds feature names (a tuple
+for exhaustive, a list for forward/backward).  When they are written into
+this folder, ``bundle/`` is then rebuilt from the pickles, so the running
+app picks the new models up.
+
+Usage::
+
+    python train_selection.py titanic.csv --n-jobs 4
+    python train_selection.py wide.csv --target label --max-size 4 --cache scores.json
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from model_pool import MODEL_FILES, ORIGINAL_FEATURES
+
+TARGET = "Survived"
+MODEL_PARAMS = {"max_iter": 1000}
+SEARCHES = {
+    "exhaustive": "Exhaustive Selection",
+    "forward": "Forward Selection",
+    "backward": "Backward Elimination",
+}
+DEFAULT_CHUNK_SIZE = 8
+
+
+# ---------------- fold scoring (runs in the workers) ----------------
+
+# Set in each worker process (inherited directly when forked)
+_shared = {}
+
+
+def _init_worker(X, y, folds, model_params, min_folds, margin):
+    _shared.update(X=X, y=y, folds=folds, model_params=model_params,
+                   min_folds=min_folds, margin=margin)
+
+
+def _fold_scores(subset, done, threshold):
+    """Continue cross-validating ``subset`` after the fold scores in ``done``."""
+    X, y, folds = _shared["X"], _shared["y"], _shared["folds"]
+    margin, min_folds = _shared["margin"], _shared["min_folds"]
+    columns = list(subset)
+    scores = list(done)
+    for train, test in folds[len(scores):]:
+        model = LogisticRegression(**_shared["model_params"])
+        model.fit(X[np.ix_(train, columns)], y[train])
+        scores.append(float(model.score(X[np.ix_(test, columns)], y[test])))
+        if (margin is not None and threshold is not None and min_folds <= len(scores) < len(folds)
+                and np.mean(scores) < threshold - margin):
+            break
+    return scores
+
+
+def _score_chunk(chunk):
+    return [(subset, _fold_scores(subset, done, threshold)) for subset, done, threshold in chunk]
+
+
+# ---------------- search ----------------
+
+class SubsetSearch:
+    """Cross-validated subset scores with shared folds, a cache and a process pool."""
+
+    def __init__(self, X, y, features, n_splits=5, seed=0, n_jobs=1, abandon_margin=0.02,
+                 min_folds=2, chunk_size=DEFAULT_CHUNK_SIZE, model_params=MODEL_PARAMS):
+        self.X = np.ascontiguousarray(X, dtype=np.float64)
+        self.y = np.asarray(y)
+        self.features = list(features)
+        self.n_splits = n_splits
+        self.model_params = dict(model_params)
+        self.chunk_size = chunk_size
+        self.folds = list(StratifiedKFold(n_splits, shuffle=True, random_state=seed)
+                          .split(self.X, self.y))
+        self.abandon_margin = abandon_margin
+        self.min_folds = min_folds
+        self.key = self._cache_key(seed)
+        self.scores = {}
+        self.stats = {"fits": 0, "cached": 0, "abandoned": 0}
+
+        worker_args = (self.X, self.y, self.folds, self.model_params, min_folds, abandon_margin)
+        _init_worker(*worker_args)
+        self.executor = None
+        if n_jobs > 1:
+            context = multiprocessing.get_context("fork") if sys.platform.startswith("linux") else None
+            self.executor = ProcessPoolExecutor(max_workers=n_jobs, mp_context=context,
+                                                initializer=_init_worker, initargs=worker_args)
+        self.n_jobs = n_jobs
+
+    def _cache_key(self, seed):
+        h = hashlib.sha256()
+        h.update(self.X.tobytes())
+        h.update(np.ascontiguousarray(self.y).tobytes())
+        h.update(json.dumps([self.features, self.n_splits, seed, self.model_params],
+                            sort_keys=True).encode())
+        return h.hexdigest()
+
+    # ---- cache ----
+
+    def load_cache(self, path):
+        """Reuse fold scores from an earlier run with the same data and settings."""
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("key") != self.key:
+            return 0
+        for subset, scores in saved["scores"].items():
+            self.scores[tuple(int(i) for i in subset.split(",") if i)] = scores
+        return len(saved["scores"])
+
+    def save_cache(self, path):
+        tmp = f"{path}.tmp-{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": self.key, "features": self.features,
+                       "scores": {",".join(map(str, s)): v for s, v in self.scores.items()}}, f)
+        os.replace(tmp, path)
+
+    def complete(self, subset):
+        return len(self.scores.get(subset, ())) == self.n_splits
+
+    def mean(self, subset):
+        return float(np.mean(self.scores[subset]))
+
+    def behind(self, subset, best_score):
+        """Whether ``subset``'s cached partial folds already rule it out."""
+        done = self.scores.get(subset, ())
+        return (self.abandon_margin is not None and len(done) >= self.min_folds
+                and np.mean(done) < best_score - self.abandon_margin)
+
+    # ---- evaluation ----
+
+    def evaluate(self, subsets):
+        """Score ``subsets`` (tuples of column indices); returns the best complete one or None.
+
+        Subsets that fall clearly behind the best so far are abandoned.
+        """
+        best, best_score = None, -np.inf
+
+        def consider(subset):
+            nonlocal best, best_score
+            if self.complete(subset) and self.mean(subset) > best_score:
+                best, best_score = subset, self.mean(subset)
+
+        def pending():
+            for subset in subsets:
+                if self.complete(subset):
+                    self.stats["cached"] += 1
+                    consider(subset)
+                elif not self.behind(subset, best_score):
+                    yield subset
+
+        def record(results):
+            for subset, scores in results:
+                self.stats["fits"] += len(scores) - len(self.scores.get(subset, ()))
+                self.scores[subset] = scores
+                if len(scores) < self.n_splits:
+                    self.stats["abandoned"] += 1
+                consider(subset)
+
+        def chunks():
+            it = pending()
+            while True:
+                chunk = list(itertools.islice(it, self.chunk_size))
+                if not chunk:
+                    return
+                # The threshold is read when the chunk is sent, so it tracks the running best
+                threshold = best_score if best is not None else None
+                yield [(s, self.scores.get(s, []), threshold) for s in chunk]
+
+        if self.executor is None:
+            for chunk in chunks():
+                record(_score_chunk(chunk))
+        else:
+            in_flight = set()
+            for chunk in chunks():
+                in_flight.add(self.executor.submit(_score_chunk, chunk))
+                if len(in_flight) >= 2 * self.n_jobs:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(future.result())
+            for future in in_flight:
+                record(future.result())
+        return best
+
+    def exhaustive(self, min_size=1, max_size=None):
+        n = len(self.features)
+        max_size = n if max_size is None else min(max_size, n)
+        subsets = itertools.chain.from_iterable(
+            itertools.combinations(range(n), k) for k in range(min_size, max_size + 1))
+        return self.evaluate(subsets)
+
+    def forward(self, max_size=None, tol=0.0):
+        """Add the best feature while it improves the CV score by more than ``tol``."""
+        max_size = len(self.features) if max_size is None else max_size
+        current, current_score = (), -np.inf
+        while len(current) < max_size:
+            candidates = [tuple(sorted(current + (j,)))
+                          for j in range(len(self.features)) if j not in current]
+            best = self.evaluate(candidates)
+            if best is None or self.mean(best) <= current_score + tol:
+                break
+            current, current_score = best, self.mean(best)
+        return current
+
+    def backward(self, min_size=1, max_size=None, tol=0.0):
+        """Drop features while the score does not fall by more than ``tol``.
+
+        Above ``max_size`` the best removal is made regardless of score.
+        """
+        current = tuple(range(len(self.features)))
+        max_size = len(current) if max_size is None else max_size
+        self.evaluate([current])
+        while len(current) > min_size:
+            candidates = [tuple(j for j in current if j != drop) for drop in current]
+            best = self.evaluate(candidates)
+            if best is None:
+                break
+            if len(current) <= max_size and self.mean(best) < self.mean(current) - tol:
+                break
+            current = best
+        return current
+
+    def fit(self, subset):
+        """The app's model refit on all rows of ``subset``'s columns."""
+        return LogisticRegression(**self.model_params).fit(self.X[:, list(subset)], self.y)
+
+    def names(self, subset):
+        return [self.features[i] for i in subset]
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+
+# ---------------- data and artifacts ----------------
+
+def load_titanic(path, features=ORIGINAL_FEATURES, target=TARGET):
+    """Feature matrix in ``features`` order (``Sex`` encoded as in the app) and target."""
+    df = pd.read_csv(path)
+    missing = [col for col in list(features) + [target] if col not in df.columns]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {missing}")
+    X = df[list(features)].copy()
+    if "Sex" in X and not pd.api.types.is_numeric_dtype(X["Sex"]):
+        X["Sex"] = (X["Sex"].str.lower() == "male").astype(int)
+    return X.to_numpy(dtype=np.float64), df[target].to_numpy()
+
+
+def write_models(results, base_dir=BASE_DIR, bundle=True):
+    """Replace each method's pickle with ``(model, selector)``.
+
+    ``bundle/`` holds all seven methods, so it is only rebuilt when writing
+    into the app's own folder, where the other pickles live.
+    """
+    for method, pair in results.items():
+        path = os.path.join(base_dir, MODEL_FILES[method])
+        tmp = f"{path}.tmp-{os.getpid()}"
+        joblib.dump(pair, tmp)
+        os.replace(tmp, path)
+    if bundle and os.path.abspath(base_dir) == BASE_DIR:
+        from common.build_bundles import build_featuresel
+
+        build_featuresel(base_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Retrain the wrapper feature-selection models.")
+    parser.add_argument("data", help="CSV with the feature columns and the target")
+    parser.add_argument("--target", default=TARGET)
+    parser.add_argument("--features", nargs="+", default=ORIGINAL_FEATURES,
+                        help="candidate columns (default: the app's six)")
+    parser.add_argument("--methods", nargs="+", default=list(SEARCHES),
+                        help=f"any of {', '.join(SEARCHES)} (default: all)")
+    parser.add_argument("--min-size", type=int, default=1)
+    parser.add_argument("--max-size", type=int, default=None,
+                        help="largest subset considered (default: all features)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--n-jobs", type=int, default=1, help="worker processes")
+    parser.add_argument("--abandon-margin", type=float, default=0.02,
+                        help="drop a subset this far below the best mean (negative: never)")
+    parser.add_argument("--min-folds", type=int, default=2,
+                        help="folds scored before a subset can be dropped (default: %(default)s)")
+    parser.add_argument("--cache", default=None, help="JSON file of fold scores to reuse")
+    parser.add_argument("--output", default=BASE_DIR,
+                        help="folder for the model pickles (default: %(default)s)")
+    parser.add_argument("--no-bundle", action="store_true", help="do not rebuild bundle/")
+    args = parser.parse_args(argv)
+    unknown = [m for m in args.methods if m not in SEARCHES]
+    if unknown:
+        parser.error(f"unknown methods: {', '.join(unknown)}")
+    n_features = len(args.features)
+    if args.max_size is None:
+        args.max_size = n_features
+    if not 1 <= args.min_size <= args.max_size <= n_features:
+        parser.error(f"need 1 <= --min-size <= --max-size <= {n_features} (the feature count)")
+    if args.features != ORIGINAL_FEATURES and not args.no_bundle:
+        print("Custom --features: the app's bundle is left alone", flush=True)
+        args.no_bundle = True
+    if os.path.abspath(args.output) != BASE_DIR and not args.no_bundle:
+        print(f"--output is not {BASE_DIR}: the app's bundle is left alone", flush=True)
+        args.no_bundle = True
+
+    X, y = load_titanic(args.data, args.features, args.target)
+    search = SubsetSearch(X, y, args.features, n_splits=args.folds, seed=args.seed,
+                          n_jobs=args.n_jobs, min_folds=args.min_folds,
+                          abandon_margin=None if args.abandon_margin < 0 else args.abandon_margin)
+    reused = search.load_cache(args.cache)
+    if reused:
+        print(f"Reusing {reused} cached subsets from {args.cache}")
+
+    results = {}
+    try:
+        for method in args.methods:
+            start = time.perf_counter()
+            if method == "exhaustive":
+                subset = search.exhaustive(args.min_size, args.max_size)
+            elif method == "forward":
+                subset = search.forward(args.max_size)
+            else:
+                subset = search.backward(args.min_size, args.max_size)
+            if not subset:
+                print(f"{SEARCHES[method]:<22} no subset found; "
+                      f"{MODEL_FILES[SEARCHES[method]]} is left alone")
+                continue
+            names = search.names(subset)
+            selector = tuple(names) if method == "exhaustive" else names
+            results[SEARCHES[method]] = (search.fit(subset), selector)
+            print(f"{SEARCHES[method]:<22} {names}  CV {search.mean(subset):.4f}  "
+                  f"({time.perf_counter() - start:.2f}s)")
+    finally:
+        search.close()
+        if args.cache:
+            search.save_cache(args.cache)
+
+    print(f"{search.stats['fits']} fold fits, {search.stats['cached']} cached subsets, "
+          f"{search.stats['abandoned']} abandoned")
+    if not results:
+        return
+    write_models(results, args.output, bundle=not args.no_bundle)
+    print(f"Wrote {', '.join(MODEL_FILES[m] for m in results)} to {args.output}"
+          + ("" if args.no_bundle else " and rebuilt bundle/"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,72 +1,211 @@
 # ==========================================================
 # Correct Final Pipeline (Scaler after Feature Selection)
 # ==========================================================
+"""Train the Team 8 attrition pipeline.
+
+Usage::
+
+    python aaa.py --data aa.csv --n-features 10 --C 1 --rfe-steps 8 4 2 1
+
+Writes one versioned artifact, the bundle (``bundle/``) that the app and
+batch scorer load.  It holds the scaler and SVC, with the selected feature
+list, the encoding manifest, training parameters, metrics and stage timings
+in its metadata.
+"""
+
+import argparse
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 
 import pandas as pd
-import numpy as np
-import joblib
 
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.model_selection import train_test_split
-from sklearn.feature_selection import RFE
-from sklearn.linear_model import LogisticRegression
 from sklearn.svm import SVC
 from sklearn.metrics import classification_report
 
-# Load dataset
-df = pd.read_csv("/Users/arun/Desktop/Unsupervised/finalpro/aa.csv")
-
-df['Attrition'] = df['Attrition'].map({'Yes':1, 'No':0})
-df.drop(['EmployeeNumber','EmployeeCount','Over18','StandardHours'], axis=1, inplace=True)
-
-# Encode categorical
-le = LabelEncoder()
-for col in df.select_dtypes(include='object').columns:
-    df[col] = le.fit_transform(df[col])
-
-X = df.drop("Attrition", axis=1)
-y = df["Attrition"]
-
-# ==========================================================
-# STEP 1: Select Top 10 Features (RFE on raw data)
-# ==========================================================
-
-rfe = RFE(LogisticRegression(max_iter=1000), n_features_to_select=10)
-rfe.fit(X, y)
-
-selected_feature_names = X.columns[rfe.support_]
-X_selected = X[selected_feature_names]
-
-print("Selected Features:", selected_feature_names)
-
-# ==========================================================
-# STEP 2: Scale ONLY selected features
-# ==========================================================
-
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X_selected)
-
-# ==========================================================
-# STEP 3: Train Model
-# ==========================================================
-
-X_train, X_test, y_train, y_test = train_test_split(
-    X_scaled, y, test_size=0.2, random_state=42
-)
-
-model = SVC(C=1, kernel='rbf', probability=True)
-model.fit(X_train, y_train)
-
-# Evaluate
-y_pred = model.predict(X_test)
-print(classification_report(y_test, y_pred))
-
-# ==========================================================
-# STEP 4: Save Files
-# ==========================================================
-
-joblib.dump(model, "team8_employee_model.pkl")
-joblib.dump(scaler, "team8_scaler.pkl")
-joblib.dump(selected_feature_names.tolist(), "team8_feature_names.pkl")
-
-print("✅ Correct 10-Feature Model Saved!")
+from encoding_manifest import build_manifest, column_defaults
+from batch_score import write_pipeline_bundle
+from common.bundle import bundle_path
+from feature_selection import select_features
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TARGET = "Attrition"
+DROP_COLUMNS = ['EmployeeNumber', 'EmployeeCount', 'Over18', 'StandardHours']
+
+# Explicit dtypes for aa.csv: categoricals are parsed straight into pandas
+# categories and integer columns into the narrowest type that fits.
+CATEGORICAL_COLUMNS = ['BusinessTravel', 'Department', 'EducationField', 'Gender',
+                       'JobRole', 'MaritalStatus', 'OverTime', 'Over18', TARGET]
+WIDE_INT_COLUMNS = ['DailyRate', 'EmployeeNumber', 'MonthlyIncome', 'MonthlyRate']
+NARROW_INT_COLUMNS = ['Age', 'DistanceFromHome', 'Education', 'EmployeeCount',
+                      'EnvironmentSatisfaction', 'HourlyRate', 'JobInvolvement', 'JobLevel',
+                      'JobSatisfaction', 'NumCompaniesWorked', 'PercentSalaryHike',
+                      'PerformanceRating', 'RelationshipSatisfaction', 'StandardHours',
+                      'StockOptionLevel', 'TotalWorkingYears', 'TrainingTimesLastYear',
+                      'WorkLifeBalance', 'YearsAtCompany', 'YearsInCurrentRole',
+                      'YearsSinceLastPromotion', 'YearsWithCurrManager']
+
+DTYPES = {
+    **{col: "category" for col in CATEGORICAL_COLUMNS},
+    **{col: "int32" for col in WIDE_INT_COLUMNS},
+    **{col: "int16" for col in NARROW_INT_COLUMNS},
+}
+
+
+@contextmanager
+def stage(timings, name):
+    start = time.perf_counter()
+    yield
+    timings[name] = time.perf_counter() - start
+    print(f"[{name}] {timings[name]:.3f}s")
+
+
+def load_data(path):
+    df = pd.read_csv(path, dtype=DTYPES, encoding="utf-8-sig")
+    df[TARGET] = df[TARGET].map({'Yes': 1, 'No': 0}).astype("int8")
+    df.drop(DROP_COLUMNS, axis=1, inplace=True)
+    return df
+
+
+def encode_categoricals(df):
+    """Label-encode each categorical column with its own fitted encoder.
+
+    Category codes follow the sorted category order, which is exactly what
+    ``LabelEncoder`` produces, so the codes are taken straight from pandas.
+    """
+    encoders = {}
+    for col in df.select_dtypes(include='category').columns:
+        categories = df[col].cat.categories
+        if not categories.is_monotonic_increasing:
+            df[col] = df[col].cat.reorder_categories(sorted(categories))
+        encoders[col] = LabelEncoder().fit(df[col].cat.categories)
+        df[col] = df[col].cat.codes.astype("int16")
+    return encoders
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the Team 8 attrition pipeline.")
+    parser.add_argument("--data", default=os.path.join(BASE_DIR, "aa.csv"),
+                        help="training CSV (default: %(default)s)")
+    parser.add_argument("--output-dir", default=BASE_DIR,
+                        help="where artifacts are written (default: %(default)s)")
+    parser.add_argument("--model-version", default=None,
+                        help="version tag stored in the artifact (default: UTC timestamp)")
+
+    rfe = parser.add_argument_group("feature selection")
+    rfe.add_argument("--n-features", type=int, default=10)
+    rfe.add_argument("--rfe-steps", type=int, nargs="+", default=[1],
+                     help="features dropped per round; the last value repeats")
+    rfe.add_argument("--rfe-warm-start", action="store_true")
+    rfe.add_argument("--rfe-cv", type=int, default=None,
+                     help="use RFECV with this many folds; --n-features becomes the "
+                          "minimum kept (no step schedule or warm start)")
+    rfe.add_argument("--n-jobs", type=int, default=None,
+                     help="parallel RFECV folds")
+    rfe.add_argument("--cache-dir", default=os.path.join(BASE_DIR, ".rfe_cache"),
+                     help="RFE result cache ('' disables)")
+
+    svc = parser.add_argument_group("model")
+    svc.add_argument("--C", type=float, default=1.0)
+    svc.add_argument("--gamma", default="scale")
+    svc.add_argument("--test-size", type=float, default=0.2)
+    svc.add_argument("--random-state", type=int, default=42)
+
+    args = parser.parse_args(argv)
+    if args.rfe_cv is not None and (len(args.rfe_steps) > 1 or args.rfe_warm_start):
+        parser.error("--rfe-cv takes a single --rfe-steps value and no --rfe-warm-start")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    timings = {}
+
+    # Load dataset
+    with stage(timings, "load"):
+        df = load_data(args.data)
+
+    # Encode categorical (defaults are taken from the raw values first)
+    with stage(timings, "encode"):
+        defaults = column_defaults(df.drop(TARGET, axis=1))
+        encoders = encode_categoricals(df)
+        encoders.pop(TARGET, None)
+
+    X = df.drop(TARGET, axis=1)
+    y = df[TARGET]
+
+    # ==========================================================
+    # STEP 1: Select Top Features (RFE on raw data)
+    # ==========================================================
+
+    steps = args.rfe_steps[0] if len(args.rfe_steps) == 1 else args.rfe_steps
+
+    with stage(timings, "select"):
+        selected_feature_names, rfe_info = select_features(
+            X, y,
+            n_features=args.n_features,
+            steps=steps,
+            warm_start=args.rfe_warm_start,
+            cv=args.rfe_cv,
+            n_jobs=args.n_jobs,
+            cache_dir=args.cache_dir or None
+        )
+    X_selected = X[selected_feature_names]
+
+    print("Selected Features:", selected_feature_names,
+          "(cached)" if rfe_info["cached"] else "")
+
+    # ==========================================================
+    # STEP 2: Scale ONLY selected features
+    # ==========================================================
+
+    with stage(timings, "scale"):
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X_selected)
+
+    # ==========================================================
+    # STEP 3: Train Model
+    # ==========================================================
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X_scaled, y, test_size=args.test_size, random_state=args.random_state
+    )
+
+    gamma = args.gamma if args.gamma in ("scale", "auto") else float(args.gamma)
+
+    with stage(timings, "train"):
+        model = SVC(C=args.C, kernel='rbf', gamma=gamma, probability=True,
+                    random_state=args.random_state)
+        model.fit(X_train, y_train)
+
+    # Evaluate
+    with stage(timings, "evaluate"):
+        y_pred = model.predict(X_test)
+        report = classification_report(y_test, y_pred, output_dict=True)
+    print(classification_report(y_test, y_pred))
+
+    # ==========================================================
+    # STEP 4: Save Files
+    # ==========================================================
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    model_version = args.model_version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    with stage(timings, "save"):
+        manifest = build_manifest(encoders, defaults, selected_feature_names, model_version)
+        write_pipeline_bundle(bundle_path(args.output_dir), model, scaler, manifest,
+                              params=vars(args), metrics={"accuracy": report["accuracy"]},
+                              timings=dict(timings))
+
+    total = sum(timings.values())
+    print("Stage timings:", ", ".join(f"{k}={v:.3f}s" for k, v in timings.items()),
+          f"(total {total:.3f}s)")
+    print(f"✅ Correct {len(selected_feature_names)}-Feature Model Saved! (version {model_version})")
+
+
+if __name__ == "__main__":
+    main()
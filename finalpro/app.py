@@ -4,9 +4,47 @@
 # ==========================================================
 
 import streamlit as st
-import pandas as pd
-import joblib
+import io
 import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from common import metrics
+from common.batching import get_batcher
+from common.prediction_cache import get_cache, model_key
+from common.startup import FAST_START, prewarm
+
+
+def load_model():
+    """``(model, scaler, manifest)`` from the shared registry."""
+    from batch_score import load_manifest, load_pipeline
+
+    # Everything comes from the one bundle aaa.py writes
+    model, scaler, feature_names = load_pipeline(BASE_DIR)
+    # Category codes and defaults stored in the bundle by aaa.py
+    return model, scaler, load_manifest(BASE_DIR, feature_names)
+
+
+def warm_up(loaded):
+    import pandas as pd
+
+    model, scaler, manifest = loaded
+    row = manifest.encode_record({})
+    model.predict_proba(scaler.transform(pd.DataFrame(row, columns=manifest.feature_names)))
+
+
+def pipeline():
+    """:func:`load_model`, reporting missing files on the page."""
+    try:
+        return load_model()
+    except Exception:
+        st.error("❌ Model bundle not found! Train it with aaa.py to create bundle/.")
+        st.stop()
+
 
 # ==========================================================
 # Page Configuration
@@ -74,15 +112,11 @@ st.write("")
 # Load Model Files
 # ==========================================================
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-try:
-    model = joblib.load(os.path.join(BASE_DIR, "team8_employee_model.pkl"))
-    scaler = joblib.load(os.path.join(BASE_DIR, "team8_scaler.pkl"))
-    feature_names = joblib.load(os.path.join(BASE_DIR, "team8_feature_names.pkl"))
-except Exception:
-    st.error("❌ Model files not found! Make sure .pkl files are in same folder.")
-    st.stop()
+if FAST_START:
+    # Loaded and warmed up in the background while the page renders
+    prewarm("finalpro", load_model, warm_up)
+else:
+    pipeline()
 
 # ==========================================================
 # Layout
@@ -113,32 +147,19 @@ with left:
         environment_sat = st.selectbox("Environment Satisfaction", [1,2,3,4])
         work_life = st.selectbox("Work Life Balance", [1,2,3,4])
 
-    # Encoding Maps (Must Match Training Encoding)
-    department_map = {"Sales":0, "Research & Development":1, "Human Resources":2}
-    gender_map = {"Male":0, "Female":1}
-    marital_map = {"Single":0, "Married":1, "Divorced":2}
-    overtime_map = {"No":0, "Yes":1}
-
-    input_data = {
+    employee = {
         "Age": age,
-        "Department": department_map[department],
-        "Gender": gender_map[gender],
-        "MaritalStatus": marital_map[marital_status],
+        "Department": department,
+        "Gender": gender,
+        "MaritalStatus": marital_status,
         "JobLevel": job_level,
         "MonthlyIncome": monthly_income,
         "YearsAtCompany": years_company,
-        "OverTime": overtime_map[overtime],
+        "OverTime": overtime,
         "EnvironmentSatisfaction": environment_sat,
         "WorkLifeBalance": work_life
     }
 
-    # Fill missing selected features
-    for feature in feature_names:
-        if feature not in input_data:
-            input_data[feature] = 0
-
-    input_df = pd.DataFrame([input_data])[feature_names]
-
     predict = st.button("🚀 Run AI Prediction")
 
     st.markdown('</div>', unsafe_allow_html=True)
@@ -151,11 +172,29 @@ with right:
     st.markdown('<div class="card"><h3>📊 AI Insights</h3>', unsafe_allow_html=True)
 
     if predict:
+        import pandas as pd
+        from batch_score import pipeline_sources
+
+        # Cached by the registry; waits for the prewarm thread if it is still loading
+        model, scaler, manifest = pipeline()
 
-        input_scaled = scaler.transform(input_df)
+        # Encoded with the training manifest; features the form does not ask
+        # for take their training median / most frequent value
+        with metrics.stage("finalpro", "encode"):
+            input_row = manifest.encode_record(employee)
 
         if hasattr(model, "predict_proba"):
-            probability = model.predict_proba(input_scaled)[0][1]
+            def attrition_probability(row):
+                with metrics.stage("finalpro", "scale"):
+                    input_scaled = scaler.transform(pd.DataFrame(row, columns=manifest.feature_names))
+                # Shared across sessions: concurrent clicks run as one SVC call
+                with metrics.stage("finalpro", "predict"):
+                    return get_batcher("finalpro.svc", model.predict_proba).predict(input_scaled)[0][1]
+
+            # Repeated inputs skip the scaler and SVC entirely
+            pipeline_key = model_key("finalpro", *pipeline_sources(BASE_DIR))
+            with metrics.profile("finalpro"):
+                probability = get_cache().get(pipeline_key, input_row, attrition_probability)
         else:
             probability = 0.5
 
@@ -202,3 +241,39 @@ with right:
         st.write("Run prediction to see AI insights.")
 
     st.markdown('</div>', unsafe_allow_html=True)
+
+# ==========================================================
+# BATCH SCORING – WHOLE WORKFORCE FILE
+# ==========================================================
+
+st.markdown('<div class="card"><h3>📂 Batch Scoring</h3>', unsafe_allow_html=True)
+
+uploaded = st.file_uploader(
+    "Upload a workforce CSV (same columns as aa.csv; missing feature columns "
+    "take their training defaults)", type="csv")
+
+if uploaded is not None and st.button("📊 Score File"):
+    import warnings
+
+    from batch_score import MissingFeaturesWarning, score_csv
+
+    output = io.StringIO()
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", MissingFeaturesWarning)
+            rows = score_csv(uploaded, output)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+    else:
+        for w in caught:
+            if issubclass(w.category, MissingFeaturesWarning):
+                st.warning(f"⚠ {w.message}")
+        st.success(f"✅ Scored {rows} employees")
+        st.download_button(
+            "⬇️ Download Scores",
+            output.getvalue(),
+            file_name="attrition_scores.csv",
+            mime="text/csv"
+        )
+
+st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,216 @@
+# ==========================================================
+# TEAM 8 – Batch Attrition Scoring
+# ==========================================================
+"""Score a whole workforce CSV (same layout as ``aa.csv``) in chunks.
+
+The file is streamed ``chunksize`` rows at a time: each chunk is encoded with
+the category codes from the training manifest, projected onto the selected
+features, scaled and scored by the SVC in one vectorized call, and its
+probabilities and risk bands are appended to the output before the next
+chunk is read.  Feature columns the file does not have take their training
+default from the manifest, as in the app's single-employee form, and a
+:class:`MissingFeaturesWarning` names them.
+``--fast`` scores with the NumPy :class:`fast_svc.CompiledSVC` instead of
+libsvm.  ``--metrics`` prints per-stage timings (encode / scale / predict
+per chunk) from :mod:`common.metrics` when the run finishes.
+
+The model, scaler, feature list and encoding manifest all come from
+``bundle/``, the one versioned artifact ``aaa.py`` writes, with the SVC's
+support vectors memory-mapped.
+
+Usage::
+
+    python batch_score.py aa.csv scored.csv --chunksize 20000 --fast
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from common import metrics
+from common.bundle import bundle_path, has_bundle, load_bundle, write_bundle
+
+from encoding_manifest import EncodingManifest
+from fast_svc import CompiledSVC
+
+THRESHOLD = 0.50
+RISK_EDGES = [0.40, 0.60]
+RISK_LABELS = np.array(["Low", "Medium", "High"])
+
+DEFAULT_CHUNKSIZE = 10000
+METRICS_NAME = "finalpro.batch"
+
+
+def write_pipeline_bundle(path, model, scaler, manifest, **metadata):
+    """Write the fitted pipeline and its encoding manifest as one bundle.
+
+    Extra keyword arguments (training parameters, metrics) go into the
+    bundle's metadata alongside ``encoding``.
+    """
+    return write_bundle(path, {"model": model, "scaler": scaler},
+                        features=manifest["feature_names"],
+                        model_version=manifest.get("model_version"),
+                        metadata={"encoding": manifest, **metadata})
+
+
+def _compiled_model(bundle):
+    return CompiledSVC.from_estimator(bundle["model"])
+
+
+def _encoding_manifest(bundle):
+    return EncodingManifest(bundle.metadata["encoding"])
+
+
+def pipeline_sources(base_dir=BASE_DIR):
+    """Artifact paths that identify the deployed pipeline (for cache keys)."""
+    return [bundle_path(base_dir)]
+
+
+def _pipeline_bundle(base_dir):
+    path = bundle_path(base_dir)
+    if not has_bundle(path):
+        raise FileNotFoundError(f"No model bundle in {path}; train one with aaa.py")
+    return path
+
+
+def load_pipeline(base_dir=BASE_DIR, fast=False):
+    """Return ``(model, scaler, feature_names)`` from the shared registry.
+
+    With ``fast=True`` the model is the compiled NumPy scorer.
+    """
+    path = _pipeline_bundle(base_dir)
+    bundle = load_bundle(path)
+    model = load_bundle(path, derive=_compiled_model) if fast else bundle["model"]
+    return model, bundle["scaler"], bundle.features
+
+
+def load_manifest(base_dir=BASE_DIR, feature_names=None):
+    """Return the training :class:`EncodingManifest` from the shared registry.
+
+    When ``feature_names`` is given, it must match the manifest's, so a
+    manifest left over from another model is never used silently.
+    """
+    source = _pipeline_bundle(base_dir)
+    manifest = load_bundle(source, derive=_encoding_manifest)
+    if feature_names is not None and list(feature_names) != manifest.feature_names:
+        raise ValueError(f"{source} was written for features {manifest.feature_names}, "
+                         f"but the model uses {list(feature_names)}")
+    return manifest
+
+
+def risk_bands(probabilities):
+    """Map attrition probabilities to Low / Medium / High (as in the app)."""
+    return RISK_LABELS[np.digitize(probabilities, RISK_EDGES)]
+
+
+class MissingFeaturesWarning(UserWarning):
+    """The input lacks model features, which were filled with training defaults."""
+
+
+def encode_features(df, manifest):
+    """Return the selected feature columns with categoricals label-encoded.
+
+    Missing feature columns take their training default.
+    """
+    return manifest.encode_frame(manifest.fill_missing(df))
+
+
+def score_frame(df, model, scaler, manifest):
+    """Score a DataFrame of raw employee rows; returns probability/prediction/risk."""
+    with metrics.stage(METRICS_NAME, "encode"):
+        X = encode_features(df, manifest)
+    with metrics.stage(METRICS_NAME, "scale"):
+        X = scaler.transform(X)
+    with metrics.stage(METRICS_NAME, "predict"):
+        probability = model.predict_proba(X)[:, 1]
+    return pd.DataFrame({
+        "AttritionProbability": probability,
+        "Prediction": np.where(probability >= THRESHOLD, "Leave", "Stay"),
+        "RiskLevel": risk_bands(probability),
+    }, index=df.index)
+
+
+def score_csv(src, dst, chunksize=DEFAULT_CHUNKSIZE, id_column="EmployeeNumber",
+              base_dir=BASE_DIR, fast=False, dtype=None, n_jobs=None):
+    """Stream ``src`` through the model and write scores to ``dst``.
+
+    ``src`` and ``dst`` may be paths or file objects.  ``id_column`` is copied
+    to the output when present so rows can be joined back.  ``fast`` selects
+    the compiled SVC, with optional ``dtype`` and ``n_jobs``.  Returns the
+    number of rows scored.  Feature columns ``src`` lacks are filled with
+    their training defaults and reported as a :class:`MissingFeaturesWarning`.
+    """
+    model, scaler, feature_names = load_pipeline(base_dir, fast=fast)
+    manifest = load_manifest(base_dir, feature_names)
+    if fast:
+        model = model.with_options(dtype=dtype, n_jobs=n_jobs)
+    wanted = set(feature_names) | {id_column}
+
+    reader = pd.read_csv(src, chunksize=chunksize, encoding="utf-8-sig",
+                         usecols=lambda col: col in wanted)
+
+    own_file = isinstance(dst, (str, os.PathLike))
+    out = open(dst, "w", newline="") if own_file else dst
+    rows = 0
+    try:
+        for chunk in reader:
+            if rows == 0:
+                missing = manifest.missing_features(chunk.columns)
+                if missing:
+                    warnings.warn(f"No {', '.join(missing)} column(s) in the input; "
+                                  "using their training defaults", MissingFeaturesWarning,
+                                  stacklevel=2)
+            with metrics.profile(METRICS_NAME, "chunk"):
+                scored = score_frame(chunk, model, scaler, manifest)
+            if id_column in chunk.columns:
+                scored.insert(0, id_column, chunk[id_column])
+            scored.to_csv(out, header=rows == 0, index=False)
+            rows += len(chunk)
+    finally:
+        if own_file:
+            out.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-score employees for attrition risk.")
+    parser.add_argument("input", help="CSV with the same columns as aa.csv")
+    parser.add_argument("output", help="where to write the scored CSV")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="rows per chunk (default: %(default)s)")
+    parser.add_argument("--id-column", default="EmployeeNumber",
+                        help="column copied to the output if present (default: %(default)s)")
+    parser.add_argument("--fast", action="store_true",
+                        help="score with the compiled NumPy SVC instead of libsvm")
+    parser.add_argument("--float32", action="store_true",
+                        help="with --fast, compute kernels in float32")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="with --fast, threads per chunk (default: %(default)s)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="print per-stage timings when done")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        metrics.enable()
+
+    start = time.perf_counter()
+    rows = score_csv(args.input, args.output, chunksize=args.chunksize,
+                     id_column=args.id_column, fast=args.fast,
+                     dtype=np.float32 if args.float32 else None, n_jobs=args.threads)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows} employees in {elapsed:.2f}s -> {args.output}")
+    if args.metrics:
+        print(metrics.summary_line())
+
+
+if __name__ == "__main__":
+    main()
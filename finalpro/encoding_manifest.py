@@ -0,0 +1,122 @@
+# ==========================================================
+# TEAM 8 – Training Encoding Manifest
+# ==========================================================
+"""The category codes and fill-in defaults used at training time.
+
+``aaa.py`` stores the manifest in the model bundle's metadata, under
+``encoding``::
+
+    {
+      "format_version": 1,
+      "model_version": "...",
+      "feature_names": [...],            # selected features, in model order
+      "categories": {"Gender": {"Female": 0, "Male": 1}, ...},
+      "defaults": {"JobSatisfaction": 3, "Gender": "Male", ...}
+    }
+
+``categories`` holds each column's fitted ``LabelEncoder`` mapping.
+``defaults`` holds the training median of every numeric column and the
+most frequent value of every categorical one.  The app and
+``batch_score.py`` compile it into an :class:`EncodingManifest`, so inputs
+are always encoded exactly as the model saw them in training.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from common.encoding import CategoryEncoder
+
+MANIFEST_FORMAT_VERSION = 1
+
+
+def column_defaults(df):
+    """Median of each numeric column, most frequent value of each other column."""
+    defaults = {}
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]) and not isinstance(df[col].dtype,
+                                                                     pd.CategoricalDtype):
+            median = float(df[col].median())
+            defaults[col] = int(median) if median.is_integer() else median
+        else:
+            defaults[col] = df[col].mode().iloc[0]
+    return defaults
+
+
+def build_manifest(encoders, defaults, feature_names, model_version=None):
+    """Manifest dict from fitted per-column LabelEncoders and column defaults."""
+    return {
+        "format_version": MANIFEST_FORMAT_VERSION,
+        "model_version": model_version,
+        "feature_names": list(feature_names),
+        "categories": {col: {str(c): i for i, c in enumerate(enc.classes_)}
+                       for col, enc in encoders.items()},
+        "defaults": {col: value.item() if isinstance(value, np.generic) else value
+                     for col, value in defaults.items()},
+    }
+
+
+class EncodingManifest:
+    """Compiled form of a manifest: lookup tables plus a pre-encoded default row."""
+
+    def __init__(self, manifest):
+        version = manifest.get("format_version")
+        if version != MANIFEST_FORMAT_VERSION:
+            raise ValueError(f"Unsupported encoding manifest version: {version!r}")
+
+        self.model_version = manifest.get("model_version")
+        self.feature_names = list(manifest["feature_names"])
+        self.encoder = CategoryEncoder.from_mappings(manifest["categories"])
+        self.defaults = dict(manifest["defaults"])
+
+        missing = [col for col in self.feature_names if col not in self.defaults]
+        if missing:
+            raise ValueError(f"Encoding manifest has no defaults for: {missing}")
+
+        self._index = {col: j for j, col in enumerate(self.feature_names)}
+        self._tables = [self.encoder.tables.get(col) for col in self.feature_names]
+        self._default_row = np.array(
+            [[table.code(self.defaults[col]) if table is not None else self.defaults[col]
+              for col, table in zip(self.feature_names, self._tables)]], dtype=np.float64)
+
+    def encode_record(self, record):
+        """One-row matrix in ``feature_names`` order.
+
+        Raw categorical values are encoded and features the record does not
+        provide take their training default.  Keys that are not model
+        features are ignored.
+        """
+        row = self._default_row.copy()
+        for col, value in record.items():
+            j = self._index.get(col)
+            if j is not None:
+                table = self._tables[j]
+                row[0, j] = table.code(value) if table is not None else value
+        return row
+
+    def missing_features(self, columns):
+        """Model features that are not among ``columns``, in feature order."""
+        columns = set(columns)
+        return [col for col in self.feature_names if col not in columns]
+
+    def fill_missing(self, df):
+        """``df`` with each absent feature column set to its training default.
+
+        The batch counterpart of :meth:`encode_record`'s fill-in.
+        """
+        missing = self.missing_features(df.columns)
+        if not missing:
+            return df
+        return df.assign(**{col: self.defaults[col] for col in missing})
+
+    def encode_frame(self, df):
+        """The model's feature columns of ``df``, categoricals encoded."""
+        return self.encoder.encode_frame(df, self.feature_names)
+
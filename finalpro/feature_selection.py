@@ -0,0 +1,128 @@
+# ==========================================================
+# TEAM 8 – Cached Recursive Feature Elimination
+# ==========================================================
+"""RFE for the attrition pipeline with step schedules, warm starts and caching.
+
+``select_features`` reproduces ``RFE(LogisticRegression(max_iter=1000),
+n_features_to_select=10)`` by default, and adds:
+
+* ``steps`` – a schedule of how many features to drop per round, e.g.
+  ``[8, 4, 2, 1]`` (the last entry repeats until the target is reached);
+* ``warm_start`` – each refit starts from the previous round's coefficients
+  restricted to the surviving columns;
+* ``cache_dir`` – results are stored as JSON keyed by a hash of the data and
+  parameters, so retraining on unchanged data skips selection entirely;
+* ``cv`` – use ``RFECV`` with folds evaluated in parallel (``n_jobs``).
+  ``n_features`` is then a lower bound: RFECV keeps the number of features
+  with the best cross-validated score.  RFECV drops a fixed number of
+  features per round and refits from scratch, so a multi-step schedule or
+  ``warm_start`` cannot be combined with ``cv``.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_selection import RFECV
+from sklearn.linear_model import LogisticRegression
+
+CACHE_VERSION = 1
+
+
+def _dataset_key(X, y, params):
+    h = hashlib.sha256()
+    h.update(json.dumps([CACHE_VERSION, list(map(str, X.columns)), params],
+                        sort_keys=True, default=str).encode())
+    h.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    h.update(pd.util.hash_pandas_object(pd.Series(np.asarray(y)), index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def _as_steps(steps):
+    return [int(s) for s in ([steps] if isinstance(steps, int) else steps)]
+
+
+def _step_schedule(steps):
+    steps = _as_steps(steps)
+    if not steps or any(s < 1 for s in steps):
+        raise ValueError("steps must be positive integers")
+    while True:
+        for s in steps[:-1]:
+            yield s
+        steps = steps[-1:]
+        yield steps[0]
+
+
+def _rfe(X, y, n_features, steps, warm_start, max_iter):
+    estimator = LogisticRegression(max_iter=max_iter, warm_start=warm_start)
+    support = np.ones(X.shape[1], dtype=bool)
+    ranking = np.ones(X.shape[1], dtype=int)
+    schedule = _step_schedule(steps)
+    values = X.to_numpy()
+
+    while support.sum() > n_features:
+        features = np.flatnonzero(support)
+        estimator.fit(values[:, features], y)
+
+        importances = (estimator.coef_ ** 2).sum(axis=0)
+        ranks = np.argsort(importances)
+        threshold = min(next(schedule), support.sum() - n_features)
+
+        support[features[ranks][:threshold]] = False
+        ranking[~support] += 1
+
+        if warm_start:
+            keep = np.ones(len(features), dtype=bool)
+            keep[ranks[:threshold]] = False
+            estimator.coef_ = estimator.coef_[:, keep]
+
+    return support, ranking
+
+
+def select_features(X, y, n_features=10, steps=1, warm_start=False, cv=None, n_jobs=None,
+                    max_iter=1000, cache_dir=None):
+    """Return ``(selected_feature_names, info)`` for DataFrame ``X``.
+
+    ``info`` records the per-feature ranking, whether the result came from
+    the cache, and the cache key.  With ``cv``, ``n_features`` is the
+    minimum number of features kept.
+    """
+    if cv is not None and (len(_as_steps(steps)) > 1 or warm_start):
+        raise ValueError("cv uses RFECV, which takes a single step and no warm start; "
+                         "pass one step value and warm_start=False, or cv=None")
+    params = {
+        "n_features": n_features,
+        "steps": steps,
+        "warm_start": warm_start,
+        "cv": cv,
+        "max_iter": max_iter,
+    }
+    key = _dataset_key(X, y, params)
+    cache_path = os.path.join(cache_dir, f"rfe_{key[:32]}.json") if cache_dir else None
+
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cached = json.load(f)
+        return cached["selected"], {"ranking": cached["ranking"], "cached": True, "key": key}
+
+    if cv is not None:
+        selector = RFECV(LogisticRegression(max_iter=max_iter), step=_as_steps(steps)[0], cv=cv,
+                         min_features_to_select=n_features, n_jobs=n_jobs)
+        selector.fit(X, y)
+        support, ranking = selector.support_, selector.ranking_
+    else:
+        support, ranking = _rfe(X, y, n_features, steps, warm_start, max_iter)
+
+    selected = X.columns[support].tolist()
+    ranking = dict(zip(map(str, X.columns), map(int, ranking)))
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"selected": selected, "ranking": ranking, "params": params}, f, indent=2)
+        os.replace(tmp_path, cache_path)
+
+    return selected, {"ranking": ranking, "cached": False, "key": key}
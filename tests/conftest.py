@@ -0,0 +1,14 @@
+# =========================================
+# Test Configuration
+# =========================================
+"""Make ``common`` and every project folder importable, as the apps do."""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+# Puts featuresel/, dbscan/, finalpro/, Team-A/ and K_Meanselbow/ on sys.path
+import common.adapters  # noqa: E402,F401
@@ -0,0 +1,38 @@
+import copy
+
+import numpy as np
+import pytest
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from common import adapters
+from common.bundle import bundle_path, write_bundle
+
+
+def publish(base_dir, kmeans, scaler, version):
+    write_bundle(bundle_path(str(base_dir)), {"kmeans": kmeans, "scaler": scaler},
+                 features=adapters.KMeansAdapter.features, model_version=version)
+
+
+@pytest.mark.parametrize("grid", ["0", "1"])
+def test_kmeans_adapter_serves_a_republished_bundle(tmp_path, monkeypatch, grid):
+    monkeypatch.setenv("KMEANS_LOOKUP_GRID", grid)
+    monkeypatch.setitem(adapters.PROJECT_DIRS, "kmeans", str(tmp_path))
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(15, 140, 200), rng.uniform(1, 99, 200)])
+    scaler = StandardScaler().fit(X)
+    kmeans = KMeans(n_clusters=4, n_init=10, random_state=0).fit(scaler.transform(X))
+    publish(tmp_path, kmeans, scaler, 1)
+
+    adapter = adapters.KMeansAdapter()
+    rows = adapter.prepare([[20, 80], [130, 10], [60, 50]])
+    before = [r["cluster"] for r in adapter.predict(rows)]
+
+    # Same clusters under new IDs
+    renumbered = copy.deepcopy(kmeans)
+    renumbered.cluster_centers_ = kmeans.cluster_centers_[::-1].copy()
+    publish(tmp_path, renumbered, scaler, 2)
+
+    after = [r["cluster"] for r in adapter.predict(rows)]
+    assert after == [3 - c for c in before]
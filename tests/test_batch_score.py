@@ -0,0 +1,42 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_score import BASE_DIR, MissingFeaturesWarning, load_manifest, load_pipeline, score_csv
+
+
+@pytest.fixture(scope="module")
+def employees():
+    return pd.read_csv(f"{BASE_DIR}/aa.csv", encoding="utf-8-sig").head(40)
+
+
+def scores(df, **options):
+    out = io.StringIO()
+    rows = score_csv(io.StringIO(df.to_csv(index=False)), out, chunksize=16, **options)
+    assert rows == len(df)
+    out.seek(0)
+    return pd.read_csv(out)
+
+
+def test_missing_columns_take_training_defaults(employees):
+    _, _, features = load_pipeline()
+    defaults = load_manifest(feature_names=features).defaults
+    dropped = ["Gender", "JobLevel"]
+
+    with pytest.warns(MissingFeaturesWarning, match="Gender, JobLevel"):
+        got = scores(employees.drop(columns=dropped))
+    expected = scores(employees.assign(**{col: defaults[col] for col in dropped}))
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_complete_file_matches_the_model(employees, recwarn):
+    model, scaler, features = load_pipeline()
+    manifest = load_manifest(feature_names=features)
+    got = scores(employees)
+
+    X = scaler.transform(manifest.encode_frame(employees))
+    assert np.allclose(got["AttritionProbability"], model.predict_proba(X)[:, 1])
+    assert list(got["EmployeeNumber"]) == list(employees["EmployeeNumber"])
+    assert not [w for w in recwarn if issubclass(w.category, MissingFeaturesWarning)]
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from sklearn.cluster import DBSCAN
+from sklearn.datasets import make_blobs
+
+from assign import NOISE, CoreSamples, DBSCANAssigner
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    X, _ = make_blobs(n_samples=600, centers=[[0, 0], [6, 6], [0, 8]], cluster_std=0.6,
+                      random_state=0)
+    X = np.vstack([X, [[20, 20], [-9, 4], [3, 3]]])
+    return X, DBSCAN(eps=0.5, min_samples=5).fit(X)
+
+
+def test_training_points_of_separated_clusters_keep_their_labels(fitted):
+    X, dbscan = fitted
+    assigner = DBSCANAssigner.from_estimator(dbscan)
+    assert np.array_equal(assigner.predict(X), dbscan.labels_)
+
+
+def test_labels_follow_the_nearest_core_sample(fitted):
+    X, dbscan = fitted
+    assigner = DBSCANAssigner.from_core(CoreSamples.from_estimator(dbscan))
+    queries = np.random.default_rng(0).uniform(-3, 9, size=(2000, 2))
+
+    labels, dist = assigner.query(queries)
+    pairwise = np.linalg.norm(queries[:, None] - dbscan.components_[None], axis=2)
+    nearest = pairwise.argmin(axis=1)
+    core_labels = dbscan.labels_[dbscan.core_sample_indices_]
+    expected = np.where(pairwise.min(axis=1) <= dbscan.eps, core_labels[nearest], NOISE)
+
+    assert np.array_equal(labels, expected)
+    assert np.allclose(dist, pairwise.min(axis=1))
+    assert assigner.predict(queries[0]).shape == (1,)
+
+
+def test_npz_round_trip(fitted, tmp_path):
+    X, dbscan = fitted
+    path = str(tmp_path / "core.npz")
+    CoreSamples.from_estimator(dbscan).save(path)
+    assigner = DBSCANAssigner.from_core(CoreSamples.load(path))
+    assert np.array_equal(assigner.predict(X), dbscan.labels_)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from fast_svc import CompiledSVC
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 6))
+    y = np.where(X[:, 0] * X[:, 1] + 0.5 * X[:, 2] + rng.normal(0, 0.3, 300) > 0, "Yes", "No")
+    scaler = StandardScaler().fit(X)
+    svc = SVC(kernel="rbf", probability=True, random_state=0).fit(scaler.transform(X), y)
+    rows = scaler.transform(rng.normal(size=(5000, 6)))
+    return svc, rows
+
+
+@pytest.mark.parametrize("options, atol", [
+    ({}, 1e-9),
+    ({"n_jobs": 4, "block_size": 512}, 1e-9),
+    ({"dtype": np.float32}, 1e-4),
+])
+def test_predict_proba_matches_sklearn(fitted, options, atol):
+    svc, rows = fitted
+    compiled = CompiledSVC.from_estimator(svc).with_options(**options)
+    assert np.abs(compiled.predict_proba(rows) - svc.predict_proba(rows)).max() <= atol
+
+
+def test_decision_and_labels_match_sklearn(fitted, tmp_path):
+    svc, rows = fitted
+    path = str(tmp_path / "svc.npz")
+    CompiledSVC.from_estimator(svc).save(path)
+    compiled = CompiledSVC.load(path)
+    assert np.allclose(compiled.decision_function(rows), svc.decision_function(rows),
+                       rtol=0, atol=1e-9)
+    assert np.array_equal(compiled.predict(rows), svc.predict(rows))
+
+
+def test_rejects_models_without_probabilities(fitted):
+    svc, rows = fitted
+    with pytest.raises(ValueError):
+        CompiledSVC.from_estimator(SVC(kernel="rbf").fit(rows[:50], svc.predict(rows[:50])))
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_selection import RFE
+from sklearn.linear_model import LogisticRegression
+
+from feature_selection import select_features
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(300, 14)), columns=[f"f{j}" for j in range(14)])
+    y = (X["f1"] - 2 * X["f4"] + X["f9"] + rng.normal(0, 0.5, 300) > 0).astype(int)
+    return X, y
+
+
+def test_default_matches_sklearn_rfe(data):
+    X, y = data
+    rfe = RFE(LogisticRegression(max_iter=1000), n_features_to_select=5).fit(X, y)
+    selected, info = select_features(X, y, n_features=5)
+    assert selected == X.columns[rfe.support_].tolist()
+    assert list(info["ranking"].values()) == rfe.ranking_.tolist()
+
+
+def test_cv_keeps_at_least_n_features(data):
+    X, y = data
+    selected, _ = select_features(X, y, n_features=4, cv=3)
+    assert len(selected) >= 4
+
+
+@pytest.mark.parametrize("options", [{"steps": [4, 1]}, {"warm_start": True}])
+def test_cv_rejects_schedules_and_warm_starts(data, options):
+    X, y = data
+    with pytest.raises(ValueError, match="RFECV"):
+        select_features(X, y, n_features=4, cv=3, **options)
+
+
+def test_cache_round_trip(data, tmp_path):
+    X, y = data
+    first, info = select_features(X, y, n_features=5, steps=[4, 1], cache_dir=str(tmp_path))
+    again, cached = select_features(X, y, n_features=5, steps=[4, 1], cache_dir=str(tmp_path))
+    assert not info["cached"] and cached["cached"]
+    assert again == first
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from forest_engine import PackedForest
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 7)).astype(np.float32)
+    y = (X[:, 0] + X[:, 3] * X[:, 5] > 0).astype(int) + (X[:, 2] > 1)
+    X[::11, 3] = np.nan
+    forest = RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+
+    rows = rng.normal(size=(3000, 7)).astype(np.float32)
+    rows[::7, 3] = np.nan
+    return forest, rows
+
+
+@pytest.mark.parametrize("options", [{}, {"n_jobs": 4, "shards": 4}, {"block_size": 64}])
+def test_predict_proba_is_bit_for_bit(fitted, options):
+    forest, rows = fitted
+    packed = PackedForest.from_estimator(forest, **options)
+    assert np.array_equal(packed.predict_proba(rows), forest.predict_proba(rows))
+    assert np.array_equal(packed.predict(rows), forest.predict(rows))
+
+
+def test_saved_forest_round_trips(fitted, tmp_path):
+    forest, rows = fitted
+    path = str(tmp_path / "forest.npz")
+    PackedForest.from_estimator(forest).save(path)
+    packed = PackedForest.load(path, mmap_mode="r")
+    assert np.array_equal(packed.predict_proba(rows[:1]), forest.predict_proba(rows[:1]))
+    assert np.array_equal(packed.predict_proba(rows), forest.predict_proba(rows))
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from sklearn.cluster import DBSCAN
+from sklearn.datasets import make_blobs
+
+from assign import CoreSamples, DBSCANAssigner
+from common.bundle import Bundle
+from grid_index import GridIndex
+from train_dbscan import save_core
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    X, _ = make_blobs(n_samples=3000, centers=6, n_features=3, cluster_std=0.8,
+                      random_state=0)
+    dbscan = DBSCAN(eps=0.4, min_samples=6).fit(X)
+    queries = np.random.default_rng(0).uniform(X.min(axis=0) - 1, X.max(axis=0) + 1,
+                                               size=(20000, 3))
+    return X, dbscan, queries
+
+
+@pytest.mark.parametrize("block_size", [4096, 100])
+def test_grid_labels_equal_kd_tree_labels(fitted, block_size):
+    X, dbscan, queries = fitted
+    grid = GridIndex.from_estimator(dbscan, block_size=block_size)
+    assigner = DBSCANAssigner.from_estimator(dbscan)
+
+    labels, dist = grid.query(queries)
+    tree_labels, tree_dist = assigner.query(queries)
+    assert np.array_equal(labels, tree_labels)
+    within = tree_dist <= dbscan.eps
+    assert np.allclose(dist[within], tree_dist[within])
+    assert np.array_equal(grid.predict(X), assigner.predict(X))
+
+
+def test_bundle_grid_equals_kd_tree(fitted, tmp_path):
+    X, dbscan, queries = fitted
+    save_core(CoreSamples.from_estimator(dbscan), str(tmp_path / "bundle"))
+    bundle = Bundle(str(tmp_path / "bundle"))
+
+    grid = GridIndex.from_bundle(bundle)
+    assert isinstance(grid.points, np.memmap)
+    assert np.array_equal(grid.predict(queries), DBSCANAssigner.from_bundle(bundle).predict(queries))
+
+
+def test_non_euclidean_models_are_rejected():
+    X, _ = make_blobs(n_samples=100, random_state=0)
+    with pytest.raises(ValueError):
+        GridIndex.from_estimator(DBSCAN(eps=0.5, metric="manhattan").fit(X))
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+import lookup_grid
+from lookup_grid import BOUNDARY, AssignmentGrid, get_grid
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(15, 140, 200), rng.uniform(1, 99, 200)])
+    scaler = StandardScaler().fit(X)
+    kmeans = KMeans(n_clusters=5, n_init=10, random_state=0).fit(scaler.transform(X))
+    return kmeans, scaler
+
+
+def test_grid_equals_kmeans_predict(fitted):
+    kmeans, scaler = fitted
+    grid = AssignmentGrid.build(kmeans, scaler)
+    # Covers points outside the grid and on cell edges as well
+    rng = np.random.default_rng(1)
+    X = np.vstack([rng.uniform([-10, -10], [160, 110], size=(100000, 2)),
+                   np.mgrid[0:150:0.5, 0:100:0.5].reshape(2, -1).T])
+
+    assert np.array_equal(grid.predict(X), kmeans.predict(scaler.transform(X)))
+    assert 0 < grid.boundary_fraction < 0.1
+
+
+def test_region_image_has_no_boundary_cells(fitted):
+    kmeans, scaler = fitted
+    grid = AssignmentGrid.build(kmeans, scaler, resolution=2.0)
+    image = grid.region_image()
+    assert image.shape == grid.cells.shape
+    assert not (image == BOUNDARY).any()
+
+
+def test_get_grid_rebuilds_for_a_new_model(fitted, monkeypatch):
+    kmeans, scaler = fitted
+    monkeypatch.setattr(lookup_grid, "_current", None)
+    grid = get_grid(kmeans, scaler)
+    assert get_grid(kmeans, scaler) is grid
+    assert get_grid(kmeans, StandardScaler().fit(scaler.mean_[None] + [[0, 0], [1, 1]])) is not grid
@@ -0,0 +1,47 @@
+import gc
+import weakref
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from common.bundle import bundle_path, write_bundle
+from model_pool import ORIGINAL_FEATURES, ModelPool
+
+
+def _pairs(n=3):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, len(ORIGINAL_FEATURES)))
+    y = (X[:, 1] > 0).astype(int)
+    pairs = {}
+    for i in range(n):
+        features = ORIGINAL_FEATURES[:i + 1]
+        model = LogisticRegression().fit(X[:, :i + 1], y)
+        pairs[f"method{i}"] = (model, list(features))
+    return pairs
+
+
+def test_evicted_bundle_pair_is_freed(tmp_path):
+    pairs = _pairs()
+    write_bundle(bundle_path(str(tmp_path)), pairs, features=ORIGINAL_FEATURES)
+    files = {name: f"{name}.pkl" for name in pairs}
+    pool = ModelPool(str(tmp_path), files=files, lazy=True, max_resident=1)
+
+    first = weakref.ref(pool.get("method0")[0])
+    pool.get("method1")
+    gc.collect()
+
+    assert pool.resident() == ["method1"]
+    assert first() is None
+
+
+def test_pool_predicts_from_pickles(tmp_path):
+    pairs = _pairs()
+    for name, pair in pairs.items():
+        joblib.dump(pair, tmp_path / f"{name}.pkl")
+    pool = ModelPool(str(tmp_path), files={name: f"{name}.pkl" for name in pairs})
+
+    X = np.zeros((2, len(ORIGINAL_FEATURES)))
+    for name, (model, features) in pairs.items():
+        expected = model.predict(X[:, :len(features)])
+        assert np.array_equal(pool.predict(name, X), expected)
@@ -0,0 +1,44 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from common.bundle import Bundle
+from online_kmeans import FEATURES, OnlineSegmenter, main
+
+
+@pytest.fixture
+def base_dir(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(np.column_stack([rng.uniform(15, 140, 200), rng.uniform(1, 99, 200)]),
+                     columns=FEATURES)
+    scaler = StandardScaler().fit(X)
+    kmeans = KMeans(n_clusters=4, n_init=10, random_state=0).fit(scaler.transform(X))
+    joblib.dump(kmeans, tmp_path / "cluster_model.pkl")
+    joblib.dump(scaler, tmp_path / "scalar.pkl")
+    X.sample(60, random_state=1).to_csv(tmp_path / "new.csv", index=False)
+    return tmp_path
+
+
+def test_main_updates_a_custom_bundle_from_the_pickles(base_dir):
+    bundle = str(base_dir / "segments")
+    main([str(base_dir / "new.csv"), "--bundle", bundle, "--batch-size", "30"])
+    assert Bundle(bundle).model_version == 2
+    assert not (base_dir / "bundle").exists()
+
+    # The next run continues from the bundle it was given
+    main([str(base_dir / "new.csv"), "--bundle", bundle, "--batch-size", "60"])
+    segmenter = OnlineSegmenter.from_bundle(bundle)
+    assert segmenter.model_version == 3
+    assert segmenter.counts.sum() == 200 + 120
+
+
+def test_update_keeps_cluster_ids(base_dir):
+    kmeans = joblib.load(base_dir / "cluster_model.pkl")
+    segmenter = OnlineSegmenter.from_models(kmeans, joblib.load(base_dir / "scalar.pkl"))
+    before = segmenter.centers
+    segmenter.update(pd.read_csv(base_dir / "new.csv"))
+    assert np.array_equal(np.linalg.norm(segmenter.centers[:, None] - before[None], axis=2)
+                          .argmin(axis=1), np.arange(4))
@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from common.server import MAX_BODY_BYTES, InferenceServer
+
+
+class EchoAdapter:
+    def predict(self, X):
+        return np.asarray(X, dtype=float).sum(axis=1)
+
+
+def exchange(request):
+    """Send one raw request to a fresh server; return ``(status, json_body)``."""
+    async def run():
+        server = InferenceServer({"echo": EchoAdapter()}, workers=1)
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(body)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("value", [b"abc", b"-5", b"1.5"])
+def test_invalid_content_length_is_400(value):
+    status, body = exchange(b"POST /predict/echo HTTP/1.1\r\nContent-Length: " + value
+                            + b"\r\n\r\n[[1, 2]]")
+    assert status == 400
+    assert body == {"error": "Invalid Content-Length"}
+
+
+def test_oversized_body_is_413():
+    length = str(MAX_BODY_BYTES + 1).encode()
+    status, _ = exchange(b"POST /predict/echo HTTP/1.1\r\nContent-Length: " + length
+                         + b"\r\n\r\n")
+    assert status == 413
+
+
+def test_health():
+    status, body = exchange(b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+    assert status == 200
+    assert body["models"] == ["echo"]
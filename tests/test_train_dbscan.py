@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from sklearn.cluster import DBSCAN
+from sklearn.datasets import make_blobs
+
+from train_dbscan import train
+
+
+@pytest.fixture(scope="module")
+def points():
+    X, _ = make_blobs(n_samples=4000, centers=8, cluster_std=1.2, random_state=0)
+    noise = np.random.default_rng(0).uniform(X.min(axis=0), X.max(axis=0), size=(400, 2))
+    return np.vstack([X, noise])
+
+
+@pytest.mark.parametrize("method", ["components", "precomputed"])
+@pytest.mark.parametrize("chunk_size, n_jobs", [(20000, 1), (700, 2)])
+def test_labels_equal_sklearn_dbscan(points, method, chunk_size, n_jobs):
+    dbscan = DBSCAN(eps=0.3, min_samples=8).fit(points)
+    labels, core, _ = train(points, 0.3, 8, chunk_size=chunk_size, n_jobs=n_jobs,
+                            method=method)
+
+    assert np.array_equal(labels, dbscan.labels_)
+    assert np.array_equal(core.core_points, dbscan.components_)
+    assert np.array_equal(core.core_labels, dbscan.labels_[dbscan.core_sample_indices_])
+
+
+def test_no_core_points_means_all_noise(points):
+    labels, core, _ = train(points[:50], 0.01, 5)
+    assert (labels == -1).all()
+    assert len(core.core_points) == 0